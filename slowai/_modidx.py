@@ -5,7 +5,22 @@ d = { 'settings': { 'branch': 'main',
                 'doc_host': 'https://jeremy.github.io',
                 'git_url': 'https://github.com/jeremy/slowai',
                 'lib_path': 'slowai'},
-  'syms': { 'slowai.activations': { 'slowai.activations.CNN': ('activations.html#cnn', 'slowai/activations.py'),
+  'syms': { 'slowai.activations': { 'slowai.activations.ActivationStats': ('activations.html#activationstats', 'slowai/activations.py'),
+                                    'slowai.activations.ActivationStats.__init__': ( 'activations.html#activationstats.__init__',
+                                                                                     'slowai/activations.py'),
+                                    'slowai.activations.ActivationStats.close': ( 'activations.html#activationstats.close',
+                                                                                  'slowai/activations.py'),
+                                    'slowai.activations.ActivationStats.emit': ( 'activations.html#activationstats.emit',
+                                                                                 'slowai/activations.py'),
+                                    'slowai.activations.ActivationStats.flush': ( 'activations.html#activationstats.flush',
+                                                                                  'slowai/activations.py'),
+                                    'slowai.activations.ActivationStats.history': ( 'activations.html#activationstats.history',
+                                                                                    'slowai/activations.py'),
+                                    'slowai.activations.ActivationStats.record': ( 'activations.html#activationstats.record',
+                                                                                   'slowai/activations.py'),
+                                    'slowai.activations.ActivationStats.select': ( 'activations.html#activationstats.select',
+                                                                                   'slowai/activations.py'),
+                                    'slowai.activations.CNN': ('activations.html#cnn', 'slowai/activations.py'),
                                     'slowai.activations.CNN.__init__': ('activations.html#cnn.__init__', 'slowai/activations.py'),
                                     'slowai.activations.CNN.forward': ('activations.html#cnn.forward', 'slowai/activations.py'),
                                     'slowai.activations.Conv2dWithReLU': ('activations.html#conv2dwithrelu', 'slowai/activations.py'),
@@ -13,6 +28,16 @@ d = { 'settings': { 'branch': 'main',
                                                                                     'slowai/activations.py'),
                                     'slowai.activations.Conv2dWithReLU.forward': ( 'activations.html#conv2dwithrelu.forward',
                                                                                    'slowai/activations.py'),
+                                    'slowai.activations.EveryN': ('activations.html#everyn', 'slowai/activations.py'),
+                                    'slowai.activations.EveryN.__call__': ('activations.html#everyn.__call__', 'slowai/activations.py'),
+                                    'slowai.activations.EveryN.__init__': ('activations.html#everyn.__init__', 'slowai/activations.py'),
+                                    'slowai.activations.EverySeconds': ('activations.html#everyseconds', 'slowai/activations.py'),
+                                    'slowai.activations.EverySeconds.__call__': ( 'activations.html#everyseconds.__call__',
+                                                                                  'slowai/activations.py'),
+                                    'slowai.activations.EverySeconds.__init__': ( 'activations.html#everyseconds.__init__',
+                                                                                  'slowai/activations.py'),
+                                    'slowai.activations.EverySeconds.reset': ( 'activations.html#everyseconds.reset',
+                                                                               'slowai/activations.py'),
                                     'slowai.activations.Hook': ('activations.html#hook', 'slowai/activations.py'),
                                     'slowai.activations.Hook.__del__': ('activations.html#hook.__del__', 'slowai/activations.py'),
                                     'slowai.activations.Hook.__init__': ('activations.html#hook.__init__', 'slowai/activations.py'),
@@ -24,23 +49,56 @@ d = { 'settings': { 'branch': 'main',
                                                                                    'slowai/activations.py'),
                                     'slowai.activations.HooksCallback.__len__': ( 'activations.html#hookscallback.__len__',
                                                                                   'slowai/activations.py'),
+                                    'slowai.activations.HooksCallback.before_batch': ( 'activations.html#hookscallback.before_batch',
+                                                                                       'slowai/activations.py'),
                                     'slowai.activations.HooksCallback.before_fit': ( 'activations.html#hookscallback.before_fit',
                                                                                      'slowai/activations.py'),
                                     'slowai.activations.HooksCallback.cleanup_fit': ( 'activations.html#hookscallback.cleanup_fit',
                                                                                       'slowai/activations.py'),
+                                    'slowai.activations.HooksCallback.modules': ( 'activations.html#hookscallback.modules',
+                                                                                  'slowai/activations.py'),
+                                    'slowai.activations.HooksCallback.reset_policy': ( 'activations.html#hookscallback.reset_policy',
+                                                                                       'slowai/activations.py'),
+                                    'slowai.activations.Reservoir': ('activations.html#reservoir', 'slowai/activations.py'),
+                                    'slowai.activations.Reservoir.__call__': ( 'activations.html#reservoir.__call__',
+                                                                               'slowai/activations.py'),
+                                    'slowai.activations.Reservoir.__init__': ( 'activations.html#reservoir.__init__',
+                                                                               'slowai/activations.py'),
+                                    'slowai.activations.Reservoir.reset': ('activations.html#reservoir.reset', 'slowai/activations.py'),
                                     'slowai.activations.StoreModuleStats': ('activations.html#storemodulestats', 'slowai/activations.py'),
                                     'slowai.activations.StoreModuleStats.__init__': ( 'activations.html#storemodulestats.__init__',
                                                                                       'slowai/activations.py'),
+                                    'slowai.activations.StoreModuleStats.hists': ( 'activations.html#storemodulestats.hists',
+                                                                                   'slowai/activations.py'),
+                                    'slowai.activations.StoreModuleStats.moments': ( 'activations.html#storemodulestats.moments',
+                                                                                     'slowai/activations.py'),
                                     'slowai.activations.StoreModuleStats.plot': ( 'activations.html#storemodulestats.plot',
                                                                                   'slowai/activations.py'),
+                                    'slowai.activations.StoreModuleStats.steps': ( 'activations.html#storemodulestats.steps',
+                                                                                   'slowai/activations.py'),
                                     'slowai.activations.StoreModuleStatsCB': ( 'activations.html#storemodulestatscb',
                                                                                'slowai/activations.py'),
                                     'slowai.activations.StoreModuleStatsCB.__init__': ( 'activations.html#storemodulestatscb.__init__',
                                                                                         'slowai/activations.py'),
+                                    'slowai.activations.StoreModuleStatsCB.after_epoch': ( 'activations.html#storemodulestatscb.after_epoch',
+                                                                                           'slowai/activations.py'),
+                                    'slowai.activations.StoreModuleStatsCB.after_fit': ( 'activations.html#storemodulestatscb.after_fit',
+                                                                                         'slowai/activations.py'),
+                                    'slowai.activations.StoreModuleStatsCB.before_batch': ( 'activations.html#storemodulestatscb.before_batch',
+                                                                                            'slowai/activations.py'),
+                                    'slowai.activations.StoreModuleStatsCB.before_fit': ( 'activations.html#storemodulestatscb.before_fit',
+                                                                                          'slowai/activations.py'),
                                     'slowai.activations.StoreModuleStatsCB.hist_plot': ( 'activations.html#storemodulestatscb.hist_plot',
                                                                                          'slowai/activations.py'),
                                     'slowai.activations.StoreModuleStatsCB.mean_std_plot': ( 'activations.html#storemodulestatscb.mean_std_plot',
                                                                                              'slowai/activations.py'),
+                                    'slowai.activations.TelemetryWriter': ('activations.html#telemetrywriter', 'slowai/activations.py'),
+                                    'slowai.activations.TelemetryWriter.__init__': ( 'activations.html#telemetrywriter.__init__',
+                                                                                     'slowai/activations.py'),
+                                    'slowai.activations.TelemetryWriter.read': ( 'activations.html#telemetrywriter.read',
+                                                                                 'slowai/activations.py'),
+                                    'slowai.activations.TelemetryWriter.write': ( 'activations.html#telemetrywriter.write',
+                                                                                  'slowai/activations.py'),
                                     'slowai.activations.set_seed': ('activations.html#set_seed', 'slowai/activations.py')},
             'slowai.attention': { 'slowai.attention.ConditionalFashionDDPM': ( 'attention.html#conditionalfashionddpm',
                                                                                'slowai/attention.py'),
@@ -108,6 +166,27 @@ d = { 'settings': { 'branch': 'main',
             'slowai.augmentation_norm': {},
             'slowai.autoencoders': { 'slowai.autoencoders.deconv': ('autoencoders.html#deconv', 'slowai/autoencoders.py'),
                                      'slowai.autoencoders.get_model': ('autoencoders.html#get_model', 'slowai/autoencoders.py')},
+            'slowai.benchmarks': { 'slowai.benchmarks.Scenario': ('benchmarks.html#scenario', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.Scenario.__init__': ('benchmarks.html#scenario.__init__', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.TimerCB': ('benchmarks.html#timercb', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.TimerCB.__init__': ('benchmarks.html#timercb.__init__', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.TimerCB._start': ('benchmarks.html#timercb._start', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.TimerCB.after_batch': ('benchmarks.html#timercb.after_batch', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.TimerCB.after_epoch': ('benchmarks.html#timercb.after_epoch', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.TimerCB.before_epoch': ( 'benchmarks.html#timercb.before_epoch',
+                                                                               'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.bench': ('benchmarks.html#bench', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.classifier_step': ('benchmarks.html#classifier_step', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.cnn': ('benchmarks.html#cnn', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.compare': ('benchmarks.html#compare', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.ddpm': ('benchmarks.html#ddpm', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.diffusion_step': ('benchmarks.html#diffusion_step', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.resnet': ('benchmarks.html#resnet', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.run_scenario': ('benchmarks.html#run_scenario', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.synchronize': ('benchmarks.html#synchronize', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.synthetic_dls': ('benchmarks.html#synthetic_dls', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.time_bare': ('benchmarks.html#time_bare', 'slowai/benchmarks.py'),
+                                   'slowai.benchmarks.tunet': ('benchmarks.html#tunet', 'slowai/benchmarks.py')},
             'slowai.calculus': { 'slowai.calculus.MNISTDataModule': ('calculus.html#mnistdatamodule', 'slowai/calculus.py'),
                                  'slowai.calculus.MNISTDataModule.__init__': ( 'calculus.html#mnistdatamodule.__init__',
                                                                                'slowai/calculus.py'),
@@ -290,9 +369,26 @@ d = { 'settings': { 'branch': 'main',
                             'slowai.fid.get_fid_logits': ('fid.html#get_fid_logits', 'slowai/fid.py'),
                             'slowai.fid.kid': ('fid.html#kid', 'slowai/fid.py'),
                             'slowai.fid.summarize': ('fid.html#summarize', 'slowai/fid.py')},
+            'slowai.inference': { 'slowai.inference.FoldingTracer': ('inference.html#foldingtracer', 'slowai/inference.py'),
+                                  'slowai.inference.FoldingTracer.is_leaf_module': ( 'inference.html#foldingtracer.is_leaf_module',
+                                                                                     'slowai/inference.py'),
+                                  'slowai.inference.bn_scale_shift': ('inference.html#bn_scale_shift', 'slowai/inference.py'),
+                                  'slowai.inference.compare_latency': ('inference.html#compare_latency', 'slowai/inference.py'),
+                                  'slowai.inference.fold_batchnorms': ('inference.html#fold_batchnorms', 'slowai/inference.py'),
+                                  'slowai.inference.fold_into': ('inference.html#fold_into', 'slowai/inference.py'),
+                                  'slowai.inference.is_batchnorm': ('inference.html#is_batchnorm', 'slowai/inference.py'),
+                                  'slowai.inference.latency': ('inference.html#latency', 'slowai/inference.py'),
+                                  'slowai.inference.modifies': ('inference.html#modifies', 'slowai/inference.py'),
+                                  'slowai.inference.mutated': ('inference.html#mutated', 'slowai/inference.py'),
+                                  'slowai.inference.only_user': ('inference.html#only_user', 'slowai/inference.py'),
+                                  'slowai.inference.optimize_for_inference': ( 'inference.html#optimize_for_inference',
+                                                                               'slowai/inference.py'),
+                                  'slowai.inference.remove_clones': ('inference.html#remove_clones', 'slowai/inference.py')},
             'slowai.initializations': { 'slowai.initializations.BatchNorm': ('initializations.html#batchnorm', 'slowai/initializations.py'),
                                         'slowai.initializations.BatchNorm.__init__': ( 'initializations.html#batchnorm.__init__',
                                                                                        'slowai/initializations.py'),
+                                        'slowai.initializations.BatchNorm.fold': ( 'initializations.html#batchnorm.fold',
+                                                                                   'slowai/initializations.py'),
                                         'slowai.initializations.BatchNorm.forward': ( 'initializations.html#batchnorm.forward',
                                                                                       'slowai/initializations.py'),
                                         'slowai.initializations.BatchNorm.update_stats': ( 'initializations.html#batchnorm.update_stats',
@@ -324,10 +420,18 @@ d = { 'settings': { 'branch': 'main',
                                         'slowai.initializations.LSUVHook': ('initializations.html#lsuvhook', 'slowai/initializations.py'),
                                         'slowai.initializations.LSUVHook.__init__': ( 'initializations.html#lsuvhook.__init__',
                                                                                       'slowai/initializations.py'),
+                                        'slowai.initializations.LSUVHook.affine': ( 'initializations.html#lsuvhook.affine',
+                                                                                    'slowai/initializations.py'),
+                                        'slowai.initializations.LSUVHook.forward': ( 'initializations.html#lsuvhook.forward',
+                                                                                     'slowai/initializations.py'),
                                         'slowai.initializations.LSUVHook.normalize': ( 'initializations.html#lsuvhook.normalize',
                                                                                        'slowai/initializations.py'),
                                         'slowai.initializations.LSUVHook.normalized': ( 'initializations.html#lsuvhook.normalized',
                                                                                         'slowai/initializations.py'),
+                                        'slowai.initializations.LSUVHook.prefix_forward': ( 'initializations.html#lsuvhook.prefix_forward',
+                                                                                            'slowai/initializations.py'),
+                                        'slowai.initializations.LSUVHook.remove': ( 'initializations.html#lsuvhook.remove',
+                                                                                    'slowai/initializations.py'),
                                         'slowai.initializations.LSUVInitialization': ( 'initializations.html#lsuvinitialization',
                                                                                        'slowai/initializations.py'),
                                         'slowai.initializations.LSUVInitialization.__init__': ( 'initializations.html#lsuvinitialization.__init__',
@@ -338,8 +442,16 @@ d = { 'settings': { 'branch': 'main',
                                                                                      'slowai/initializations.py'),
                                         'slowai.initializations.NormalizeBatchCB.__init__': ( 'initializations.html#normalizebatchcb.__init__',
                                                                                               'slowai/initializations.py'),
+                                        'slowai.initializations.NormalizeBatchCB.affine': ( 'initializations.html#normalizebatchcb.affine',
+                                                                                            'slowai/initializations.py'),
+                                        'slowai.initializations.NormalizeBatchCB.before_batch': ( 'initializations.html#normalizebatchcb.before_batch',
+                                                                                                  'slowai/initializations.py'),
                                         'slowai.initializations.NormalizeBatchCB.tfm': ( 'initializations.html#normalizebatchcb.tfm',
                                                                                          'slowai/initializations.py'),
+                                        'slowai.initializations.NormalizeBatchCB.track': ( 'initializations.html#normalizebatchcb.track',
+                                                                                           'slowai/initializations.py'),
+                                        'slowai.initializations.StopForward': ( 'initializations.html#stopforward',
+                                                                                'slowai/initializations.py'),
                                         'slowai.initializations.init_leaky_weights': ( 'initializations.html#init_leaky_weights',
                                                                                        'slowai/initializations.py')},
             'slowai.learner': { 'slowai.learner.Callback': ('learner.html#callback', 'slowai/learner.py'),
@@ -348,22 +460,68 @@ d = { 'settings': { 'branch': 'main',
                                 'slowai.learner.CancelBatchException': ('learner.html#cancelbatchexception', 'slowai/learner.py'),
                                 'slowai.learner.CancelEpochException': ('learner.html#cancelepochexception', 'slowai/learner.py'),
                                 'slowai.learner.CancelFitException': ('learner.html#cancelfitexception', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB': ('learner.html#checkpointcb', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.__init__': ('learner.html#checkpointcb.__init__', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.after_batch': ('learner.html#checkpointcb.after_batch', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.after_fit': ('learner.html#checkpointcb.after_fit', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.before_batch': ('learner.html#checkpointcb.before_batch', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.before_epoch': ('learner.html#checkpointcb.before_epoch', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.before_fit': ('learner.html#checkpointcb.before_fit', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.cleanup_fit': ('learner.html#checkpointcb.cleanup_fit', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.generator': ('learner.html#checkpointcb.generator', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.sampler': ('learner.html#checkpointcb.sampler', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.save': ('learner.html#checkpointcb.save', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.stateful': ('learner.html#checkpointcb.stateful', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.wait': ('learner.html#checkpointcb.wait', 'slowai/learner.py'),
+                                'slowai.learner.CheckpointCB.write': ('learner.html#checkpointcb.write', 'slowai/learner.py'),
                                 'slowai.learner.DataLoaders': ('learner.html#dataloaders', 'slowai/learner.py'),
+                                'slowai.learner.DataLoaders.__enter__': ('learner.html#dataloaders.__enter__', 'slowai/learner.py'),
+                                'slowai.learner.DataLoaders.__exit__': ('learner.html#dataloaders.__exit__', 'slowai/learner.py'),
                                 'slowai.learner.DataLoaders.__getitem__': ('learner.html#dataloaders.__getitem__', 'slowai/learner.py'),
                                 'slowai.learner.DataLoaders.__init__': ('learner.html#dataloaders.__init__', 'slowai/learner.py'),
+                                'slowai.learner.DataLoaders.close': ('learner.html#dataloaders.close', 'slowai/learner.py'),
+                                'slowai.learner.DataLoaders.decoding': ('learner.html#dataloaders.decoding', 'slowai/learner.py'),
                                 'slowai.learner.DataLoaders.dl': ('learner.html#dataloaders.dl', 'slowai/learner.py'),
                                 'slowai.learner.DataLoaders.from_dsd': ('learner.html#dataloaders.from_dsd', 'slowai/learner.py'),
                                 'slowai.learner.DataLoaders.from_hf': ('learner.html#dataloaders.from_hf', 'slowai/learner.py'),
+                                'slowai.learner.DataLoaders.generator': ('learner.html#dataloaders.generator', 'slowai/learner.py'),
                                 'slowai.learner.DataLoaders.get_unique_outputs': ( 'learner.html#dataloaders.get_unique_outputs',
                                                                                    'slowai/learner.py'),
                                 'slowai.learner.DataLoaders.listify': ('learner.html#dataloaders.listify', 'slowai/learner.py'),
                                 'slowai.learner.DataLoaders.peek': ('learner.html#dataloaders.peek', 'slowai/learner.py'),
+                                'slowai.learner.DataLoaders.streaming': ('learner.html#dataloaders.streaming', 'slowai/learner.py'),
+                                'slowai.learner.DataLoaders.streaming_dl': ('learner.html#dataloaders.streaming_dl', 'slowai/learner.py'),
                                 'slowai.learner.DataLoaders.with_transforms': ( 'learner.html#dataloaders.with_transforms',
                                                                                 'slowai/learner.py'),
+                                'slowai.learner.DatasetCache': ('learner.html#datasetcache', 'slowai/learner.py'),
+                                'slowai.learner.DatasetCache.__call__': ('learner.html#datasetcache.__call__', 'slowai/learner.py'),
+                                'slowai.learner.DatasetCache.__init__': ('learner.html#datasetcache.__init__', 'slowai/learner.py'),
+                                'slowai.learner.DatasetCache.entries': ('learner.html#datasetcache.entries', 'slowai/learner.py'),
+                                'slowai.learner.DatasetCache.evict': ('learner.html#datasetcache.evict', 'slowai/learner.py'),
+                                'slowai.learner.DatasetCache.key': ('learner.html#datasetcache.key', 'slowai/learner.py'),
+                                'slowai.learner.DatasetCache.nbytes': ('learner.html#datasetcache.nbytes', 'slowai/learner.py'),
+                                'slowai.learner.DatasetCache.save': ('learner.html#datasetcache.save', 'slowai/learner.py'),
                                 'slowai.learner.DeviceCB': ('learner.html#devicecb', 'slowai/learner.py'),
                                 'slowai.learner.DeviceCB.__init__': ('learner.html#devicecb.__init__', 'slowai/learner.py'),
                                 'slowai.learner.DeviceCB.before_batch': ('learner.html#devicecb.before_batch', 'slowai/learner.py'),
                                 'slowai.learner.DeviceCB.before_fit': ('learner.html#devicecb.before_fit', 'slowai/learner.py'),
+                                'slowai.learner.EpochBatchSampler': ('learner.html#epochbatchsampler', 'slowai/learner.py'),
+                                'slowai.learner.EpochBatchSampler.__init__': ( 'learner.html#epochbatchsampler.__init__',
+                                                                               'slowai/learner.py'),
+                                'slowai.learner.EpochBatchSampler.__iter__': ( 'learner.html#epochbatchsampler.__iter__',
+                                                                               'slowai/learner.py'),
+                                'slowai.learner.EpochBatchSampler.__len__': ('learner.html#epochbatchsampler.__len__', 'slowai/learner.py'),
+                                'slowai.learner.EpochBatchSampler.order': ('learner.html#epochbatchsampler.order', 'slowai/learner.py'),
+                                'slowai.learner.EpochBatchSampler.set_epoch': ( 'learner.html#epochbatchsampler.set_epoch',
+                                                                                'slowai/learner.py'),
+                                'slowai.learner.ImageBatch': ('learner.html#imagebatch', 'slowai/learner.py'),
+                                'slowai.learner.ImageBatch.__call__': ('learner.html#imagebatch.__call__', 'slowai/learner.py'),
+                                'slowai.learner.ImageBatch.__init__': ('learner.html#imagebatch.__init__', 'slowai/learner.py'),
+                                'slowai.learner.ImageBatch.__repr__': ('learner.html#imagebatch.__repr__', 'slowai/learner.py'),
+                                'slowai.learner.ImageBatch.as_hwc': ('learner.html#imagebatch.as_hwc', 'slowai/learner.py'),
+                                'slowai.learner.ImageBatch.convert': ('learner.html#imagebatch.convert', 'slowai/learner.py'),
+                                'slowai.learner.ImageBatch.decode': ('learner.html#imagebatch.decode', 'slowai/learner.py'),
+                                'slowai.learner.ImageBatch.resize': ('learner.html#imagebatch.resize', 'slowai/learner.py'),
                                 'slowai.learner.LRFinderCB': ('learner.html#lrfindercb', 'slowai/learner.py'),
                                 'slowai.learner.LRFinderCB.__init__': ('learner.html#lrfindercb.__init__', 'slowai/learner.py'),
                                 'slowai.learner.LRFinderCB.after_batch': ('learner.html#lrfindercb.after_batch', 'slowai/learner.py'),
@@ -372,17 +530,24 @@ d = { 'settings': { 'branch': 'main',
                                 'slowai.learner.Learner': ('learner.html#learner', 'slowai/learner.py'),
                                 'slowai.learner.Learner.__getattr__': ('learner.html#learner.__getattr__', 'slowai/learner.py'),
                                 'slowai.learner.Learner.__init__': ('learner.html#learner.__init__', 'slowai/learner.py'),
+                                'slowai.learner.Learner._accumulation': ('learner.html#learner._accumulation', 'slowai/learner.py'),
                                 'slowai.learner.Learner._fit': ('learner.html#learner._fit', 'slowai/learner.py'),
+                                'slowai.learner.Learner._micro_batches': ('learner.html#learner._micro_batches', 'slowai/learner.py'),
                                 'slowai.learner.Learner._one_batch': ('learner.html#learner._one_batch', 'slowai/learner.py'),
                                 'slowai.learner.Learner._one_epoch': ('learner.html#learner._one_epoch', 'slowai/learner.py'),
+                                'slowai.learner.Learner._one_micro_batch': ('learner.html#learner._one_micro_batch', 'slowai/learner.py'),
                                 'slowai.learner.Learner.callback': ('learner.html#learner.callback', 'slowai/learner.py'),
+                                'slowai.learner.Learner.dispatch_table': ('learner.html#learner.dispatch_table', 'slowai/learner.py'),
                                 'slowai.learner.Learner.fit': ('learner.html#learner.fit', 'slowai/learner.py'),
                                 'slowai.learner.Learner.one_epoch': ('learner.html#learner.one_epoch', 'slowai/learner.py'),
+                                'slowai.learner.Learner.reset_dispatch': ('learner.html#learner.reset_dispatch', 'slowai/learner.py'),
                                 'slowai.learner.Learner.run_cbs': ('learner.html#learner.run_cbs', 'slowai/learner.py'),
                                 'slowai.learner.Learner.training': ('learner.html#learner.training', 'slowai/learner.py'),
                                 'slowai.learner.MetricsCB': ('learner.html#metricscb', 'slowai/learner.py'),
                                 'slowai.learner.MetricsCB.__init__': ('learner.html#metricscb.__init__', 'slowai/learner.py'),
                                 'slowai.learner.MetricsCB._log': ('learner.html#metricscb._log', 'slowai/learner.py'),
+                                'slowai.learner.MetricsCB._update_on_device': ( 'learner.html#metricscb._update_on_device',
+                                                                                'slowai/learner.py'),
                                 'slowai.learner.MetricsCB.after_batch': ('learner.html#metricscb.after_batch', 'slowai/learner.py'),
                                 'slowai.learner.MetricsCB.after_epoch': ('learner.html#metricscb.after_epoch', 'slowai/learner.py'),
                                 'slowai.learner.MetricsCB.before_epoch': ('learner.html#metricscb.before_epoch', 'slowai/learner.py'),
@@ -390,13 +555,53 @@ d = { 'settings': { 'branch': 'main',
                                 'slowai.learner.MomentumCB': ('learner.html#momentumcb', 'slowai/learner.py'),
                                 'slowai.learner.MomentumCB.__init__': ('learner.html#momentumcb.__init__', 'slowai/learner.py'),
                                 'slowai.learner.MomentumCB.zero_grad': ('learner.html#momentumcb.zero_grad', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB': ('learner.html#profilecb', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB.__init__': ('learner.html#profilecb.__init__', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB._now': ('learner.html#profilecb._now', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB._record': ('learner.html#profilecb._record', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB._stop_profiler': ('learner.html#profilecb._stop_profiler', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB._timed': ('learner.html#profilecb._timed', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB._timed_dispatch_table': ( 'learner.html#profilecb._timed_dispatch_table',
+                                                                                    'slowai/learner.py'),
+                                'slowai.learner.ProfileCB.after_epoch': ('learner.html#profilecb.after_epoch', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB.before_batch': ('learner.html#profilecb.before_batch', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB.before_epoch': ('learner.html#profilecb.before_epoch', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB.before_fit': ('learner.html#profilecb.before_fit', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB.bound': ('learner.html#profilecb.bound', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB.cleanup_batch': ('learner.html#profilecb.cleanup_batch', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB.cleanup_fit': ('learner.html#profilecb.cleanup_fit', 'slowai/learner.py'),
+                                'slowai.learner.ProfileCB.table': ('learner.html#profilecb.table', 'slowai/learner.py'),
                                 'slowai.learner.ProgressCB': ('learner.html#progresscb', 'slowai/learner.py'),
                                 'slowai.learner.ProgressCB.__init__': ('learner.html#progresscb.__init__', 'slowai/learner.py'),
+                                'slowai.learner.ProgressCB._flush': ('learner.html#progresscb._flush', 'slowai/learner.py'),
                                 'slowai.learner.ProgressCB._log': ('learner.html#progresscb._log', 'slowai/learner.py'),
+                                'slowai.learner.ProgressCB._update_graph': ('learner.html#progresscb._update_graph', 'slowai/learner.py'),
                                 'slowai.learner.ProgressCB.after_batch': ('learner.html#progresscb.after_batch', 'slowai/learner.py'),
                                 'slowai.learner.ProgressCB.after_epoch': ('learner.html#progresscb.after_epoch', 'slowai/learner.py'),
                                 'slowai.learner.ProgressCB.before_epoch': ('learner.html#progresscb.before_epoch', 'slowai/learner.py'),
                                 'slowai.learner.ProgressCB.before_fit': ('learner.html#progresscb.before_fit', 'slowai/learner.py'),
+                                'slowai.learner.SkipBatches': ('learner.html#skipbatches', 'slowai/learner.py'),
+                                'slowai.learner.SkipBatches.__init__': ('learner.html#skipbatches.__init__', 'slowai/learner.py'),
+                                'slowai.learner.SkipBatches.__iter__': ('learner.html#skipbatches.__iter__', 'slowai/learner.py'),
+                                'slowai.learner.SkipBatches.__len__': ('learner.html#skipbatches.__len__', 'slowai/learner.py'),
+                                'slowai.learner.StreamingDataLoader': ('learner.html#streamingdataloader', 'slowai/learner.py'),
+                                'slowai.learner.StreamingDataLoader.__init__': ( 'learner.html#streamingdataloader.__init__',
+                                                                                 'slowai/learner.py'),
+                                'slowai.learner.StreamingDataLoader.__iter__': ( 'learner.html#streamingdataloader.__iter__',
+                                                                                 'slowai/learner.py'),
+                                'slowai.learner.StreamingDataLoader.set_epoch': ( 'learner.html#streamingdataloader.set_epoch',
+                                                                                  'slowai/learner.py'),
+                                'slowai.learner.TensorStore': ('learner.html#tensorstore', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.__getitem__': ('learner.html#tensorstore.__getitem__', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.__getitems__': ('learner.html#tensorstore.__getitems__', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.__getstate__': ('learner.html#tensorstore.__getstate__', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.__init__': ('learner.html#tensorstore.__init__', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.__len__': ('learner.html#tensorstore.__len__', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.features': ('learner.html#tensorstore.features', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.open': ('learner.html#tensorstore.open', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.stats': ('learner.html#tensorstore.stats', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.unique': ('learner.html#tensorstore.unique', 'slowai/learner.py'),
+                                'slowai.learner.TensorStore.write': ('learner.html#tensorstore.write', 'slowai/learner.py'),
                                 'slowai.learner.TrainCB': ('learner.html#traincb', 'slowai/learner.py'),
                                 'slowai.learner.TrainCB.backward': ('learner.html#traincb.backward', 'slowai/learner.py'),
                                 'slowai.learner.TrainCB.get_loss': ('learner.html#traincb.get_loss', 'slowai/learner.py'),
@@ -410,13 +615,32 @@ d = { 'settings': { 'branch': 'main',
                                 'slowai.learner.TrainLearner.step': ('learner.html#trainlearner.step', 'slowai/learner.py'),
                                 'slowai.learner.TrainLearner.zero_grad': ('learner.html#trainlearner.zero_grad', 'slowai/learner.py'),
                                 'slowai.learner.after': ('learner.html#after', 'slowai/learner.py'),
+                                'slowai.learner.atomic_write': ('learner.html#atomic_write', 'slowai/learner.py'),
+                                'slowai.learner.batch_size': ('learner.html#batch_size', 'slowai/learner.py'),
                                 'slowai.learner.batchify': ('learner.html#batchify', 'slowai/learner.py'),
                                 'slowai.learner.before': ('learner.html#before', 'slowai/learner.py'),
+                                'slowai.learner.benchmark': ('learner.html#benchmark', 'slowai/learner.py'),
+                                'slowai.learner.cache_key': ('learner.html#cache_key', 'slowai/learner.py'),
+                                'slowai.learner.cat_batch': ('learner.html#cat_batch', 'slowai/learner.py'),
                                 'slowai.learner.fashion_mnist': ('learner.html#fashion_mnist', 'slowai/learner.py'),
+                                'slowai.learner.fetch': ('learner.html#fetch', 'slowai/learner.py'),
+                                'slowai.learner.from_tensor_store': ('learner.html#from_tensor_store', 'slowai/learner.py'),
+                                'slowai.learner.image_stats': ('learner.html#image_stats', 'slowai/learner.py'),
+                                'slowai.learner.loader_throughput': ('learner.html#loader_throughput', 'slowai/learner.py'),
                                 'slowai.learner.lr_find': ('learner.html#lr_find', 'slowai/learner.py'),
+                                'slowai.learner.lr_find_parallel': ('learner.html#lr_find_parallel', 'slowai/learner.py'),
+                                'slowai.learner.mark_last': ('learner.html#mark_last', 'slowai/learner.py'),
                                 'slowai.learner.only': ('learner.html#only', 'slowai/learner.py'),
+                                'slowai.learner.rng_state': ('learner.html#rng_state', 'slowai/learner.py'),
+                                'slowai.learner.set_rng_state': ('learner.html#set_rng_state', 'slowai/learner.py'),
+                                'slowai.learner.skip_batches': ('learner.html#skip_batches', 'slowai/learner.py'),
+                                'slowai.learner.snapshot': ('learner.html#snapshot', 'slowai/learner.py'),
+                                'slowai.learner.split_batch': ('learner.html#split_batch', 'slowai/learner.py'),
+                                'slowai.learner.stage_times': ('learner.html#stage_times', 'slowai/learner.py'),
+                                'slowai.learner.stream_stage_times': ('learner.html#stream_stage_times', 'slowai/learner.py'),
                                 'slowai.learner.tensorize_images': ('learner.html#tensorize_images', 'slowai/learner.py'),
                                 'slowai.learner.to_cpu': ('learner.html#to_cpu', 'slowai/learner.py'),
+                                'slowai.learner.untransformed': ('learner.html#untransformed', 'slowai/learner.py'),
                                 'slowai.learner.with_cbs': ('learner.html#with_cbs', 'slowai/learner.py'),
                                 'slowai.learner.with_cbs.__call__': ('learner.html#with_cbs.__call__', 'slowai/learner.py'),
                                 'slowai.learner.with_cbs.__init__': ('learner.html#with_cbs.__init__', 'slowai/learner.py')},
@@ -479,13 +703,31 @@ d = { 'settings': { 'branch': 'main',
                             'slowai.sgd.BaseSchedulerCB.__init__': ('stable_sgd.html#baseschedulercb.__init__', 'slowai/sgd.py'),
                             'slowai.sgd.BaseSchedulerCB._step': ('stable_sgd.html#baseschedulercb._step', 'slowai/sgd.py'),
                             'slowai.sgd.BaseSchedulerCB.before_fit': ('stable_sgd.html#baseschedulercb.before_fit', 'slowai/sgd.py'),
+                            'slowai.sgd.BaseSchedulerCB.load_state_dict': ( 'stable_sgd.html#baseschedulercb.load_state_dict',
+                                                                            'slowai/sgd.py'),
+                            'slowai.sgd.BaseSchedulerCB.state_dict': ('stable_sgd.html#baseschedulercb.state_dict', 'slowai/sgd.py'),
                             'slowai.sgd.BatchSchedulerCB': ('stable_sgd.html#batchschedulercb', 'slowai/sgd.py'),
                             'slowai.sgd.BatchSchedulerCB.after_batch': ('stable_sgd.html#batchschedulercb.after_batch', 'slowai/sgd.py'),
                             'slowai.sgd.RecorderCB': ('stable_sgd.html#recordercb', 'slowai/sgd.py'),
                             'slowai.sgd.RecorderCB.__init__': ('stable_sgd.html#recordercb.__init__', 'slowai/sgd.py'),
                             'slowai.sgd.RecorderCB.after_batch': ('stable_sgd.html#recordercb.after_batch', 'slowai/sgd.py'),
                             'slowai.sgd.RecorderCB.before_fit': ('stable_sgd.html#recordercb.before_fit', 'slowai/sgd.py'),
+                            'slowai.sgd.RecorderCB.compile': ('stable_sgd.html#recordercb.compile', 'slowai/sgd.py'),
                             'slowai.sgd.RecorderCB.plot': ('stable_sgd.html#recordercb.plot', 'slowai/sgd.py'),
+                            'slowai.sgd.RecorderCB.recs': ('stable_sgd.html#recordercb.recs', 'slowai/sgd.py'),
+                            'slowai.sgd.RecorderCB.store': ('stable_sgd.html#recordercb.store', 'slowai/sgd.py'),
+                            'slowai.sgd.ScheduleCB': ('stable_sgd.html#schedulecb', 'slowai/sgd.py'),
+                            'slowai.sgd.ScheduleCB.__init__': ('stable_sgd.html#schedulecb.__init__', 'slowai/sgd.py'),
+                            'slowai.sgd.ScheduleCB.after_batch': ('stable_sgd.html#schedulecb.after_batch', 'slowai/sgd.py'),
+                            'slowai.sgd.ScheduleCB.before_batch': ('stable_sgd.html#schedulecb.before_batch', 'slowai/sgd.py'),
+                            'slowai.sgd.ScheduleCB.before_fit': ('stable_sgd.html#schedulecb.before_fit', 'slowai/sgd.py'),
+                            'slowai.sgd.ScheduleCB.load_state_dict': ('stable_sgd.html#schedulecb.load_state_dict', 'slowai/sgd.py'),
+                            'slowai.sgd.ScheduleCB.set': ('stable_sgd.html#schedulecb.set', 'slowai/sgd.py'),
+                            'slowai.sgd.ScheduleCB.state_dict': ('stable_sgd.html#schedulecb.state_dict', 'slowai/sgd.py'),
+                            'slowai.sgd.compile_spec': ('stable_sgd.html#compile_spec', 'slowai/sgd.py'),
+                            'slowai.sgd.cos_anneal': ('stable_sgd.html#cos_anneal', 'slowai/sgd.py'),
+                            'slowai.sgd.cosine': ('stable_sgd.html#cosine', 'slowai/sgd.py'),
+                            'slowai.sgd.one_cycle': ('stable_sgd.html#one_cycle', 'slowai/sgd.py'),
                             'slowai.sgd.train': ('stable_sgd.html#train', 'slowai/sgd.py'),
                             'slowai.sgd.train_1cycle': ('stable_sgd.html#train_1cycle', 'slowai/sgd.py')},
             'slowai.style_transfer': { 'slowai.style_transfer.GramLoss': ('style_transfer.html#gramloss', 'slowai/style_transfer.py'),
@@ -537,6 +779,14 @@ d = { 'settings': { 'branch': 'main',
                                   'slowai.super_rez.preprocess': ('super_resolution.html#preprocess', 'slowai/super_rez.py'),
                                   'slowai.super_rez.train': ('super_resolution.html#train', 'slowai/super_rez.py'),
                                   'slowai.super_rez.viz': ('super_resolution.html#viz', 'slowai/super_rez.py')},
+            'slowai.sweep': { 'slowai.sweep.TrialMetricsCB': ('sweep.html#trialmetricscb', 'slowai/sweep.py'),
+                              'slowai.sweep.TrialMetricsCB.after_epoch': ('sweep.html#trialmetricscb.after_epoch', 'slowai/sweep.py'),
+                              'slowai.sweep.TrialMetricsCB.before_fit': ('sweep.html#trialmetricscb.before_fit', 'slowai/sweep.py'),
+                              'slowai.sweep.fit_trial': ('sweep.html#fit_trial', 'slowai/sweep.py'),
+                              'slowai.sweep.pin_threads': ('sweep.html#pin_threads', 'slowai/sweep.py'),
+                              'slowai.sweep.run_trial': ('sweep.html#run_trial', 'slowai/sweep.py'),
+                              'slowai.sweep.sweep': ('sweep.html#sweep', 'slowai/sweep.py'),
+                              'slowai.sweep.tensor_store_dls': ('sweep.html#tensor_store_dls', 'slowai/sweep.py')},
             'slowai.t_pred': {'slowai.t_pred.ddim_t_pred': ('predicting_t.html#ddim_t_pred', 'slowai/t_pred.py')},
             'slowai.tinyimagenet_a': { 'slowai.tinyimagenet_a.StackableResidualConvBlock': ( 'tiny_imagenet_a.html#stackableresidualconvblock',
                                                                                              'slowai/tinyimagenet_a.py'),
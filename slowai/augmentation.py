@@ -40,7 +40,9 @@ from .sgd import BatchSchedulerCB
 from .utils import show_images
 
 # %% ../nbs/12_augmentation.ipynb 6
-def train(model, lr=1e-2, n_epochs=2, dls=fashion_mnist(512), extra_cbs=tuple()):
+def train(model, lr=1e-2, n_epochs=2, dls=None, extra_cbs=tuple()):
+    if dls is None:
+        dls = fashion_mnist(512)
     T_max = len(dls["train"]) * n_epochs
     scheduler = BatchSchedulerCB(lr_scheduler.OneCycleLR, max_lr=lr, total_steps=T_max)
     cbs = [
@@ -0,0 +1,260 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/98_benchmarks.ipynb.
+
+# %% auto 0
+__all__ = ['scenarios', 'synthetic_dls', 'classifier_step', 'diffusion_step', 'Scenario', 'cnn', 'resnet', 'ddpm', 'tunet',
+           'synchronize', 'TimerCB', 'time_bare', 'run_scenario', 'bench', 'compare']
+
+# %% ../nbs/98_benchmarks.ipynb 2
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import fastcore.all as fc
+import torch
+import torch.nn.functional as F
+from torch.optim import lr_scheduler
+from torch.utils.data import DataLoader, TensorDataset
+from torchmetrics.classification import MulticlassAccuracy
+
+from slowai.learner import (
+    Callback,
+    DeviceCB,
+    Learner,
+    MetricsCB,
+    ProgressCB,
+    TrainCB,
+    TrainLearner,
+    after,
+    def_device,
+    to_device,
+)
+from .sgd import BatchSchedulerCB
+
+# %% ../nbs/98_benchmarks.ipynb 4
+def synthetic_dls(shape=(1, 28, 28), n_classes=10, bs=64, n_batches=32, seed=0):
+    """Random images and labels, shaped like the real data"""
+    g = torch.Generator().manual_seed(seed)
+    n = bs * n_batches
+    x = torch.randn(n, *shape, generator=g)
+    y = torch.randint(0, n_classes, (n,), generator=g)
+    ds = TensorDataset(x, y)
+    return {
+        "train": DataLoader(ds, batch_size=bs, drop_last=True),
+        "test": DataLoader(ds, batch_size=bs),
+    }
+
+# %% ../nbs/98_benchmarks.ipynb 7
+def classifier_step(model, batch, loss_func):
+    """Bare training step for a classifier"""
+    xb, yb = batch
+    return loss_func(model(xb), yb)
+
+
+def diffusion_step(cb):
+    """Bare training step for a diffusion callback, like `DDPM`"""
+
+    def step(model, batch, loss_func):
+        learn = SimpleNamespace(model=model, batch=batch)
+        cb.before_batch(learn)
+        cb.predict(learn)
+        _, ε = learn.batch
+        return loss_func(learn.preds, ε)
+
+    return step
+
+
+class Scenario:
+    """A model and the callback stack that trains it"""
+
+    def __init__(
+        self,
+        model_f,
+        cbs_f=list,
+        bare_step=classifier_step,
+        shape=(1, 28, 28),
+        learner_cls=TrainLearner,
+        loss_func=F.cross_entropy,
+        lr=1e-2,
+        opt_func=torch.optim.AdamW,
+    ):
+        fc.store_attr()
+
+# %% ../nbs/98_benchmarks.ipynb 8
+# These modules download Fashion MNIST when imported, so import them lazily
+
+
+def cnn():
+    from slowai.activations import CNN
+
+    return Scenario(
+        CNN, lambda: [MetricsCB(accuracy=MulticlassAccuracy(num_classes=10))]
+    )
+
+
+def resnet():
+    from slowai.augmentation import ResNetWithGlobalPooling
+
+    return Scenario(
+        ResNetWithGlobalPooling,
+        lambda: [MetricsCB(accuracy=MulticlassAccuracy(num_classes=10))],
+    )
+
+
+def ddpm():
+    from slowai.ddpm import DDPM, fashion_unet
+
+    return Scenario(
+        fashion_unet,
+        lambda: [DDPM(), TrainCB(), MetricsCB()],
+        bare_step=diffusion_step(DDPM()),
+        shape=(1, 32, 32),
+        learner_cls=Learner,
+        loss_func=F.mse_loss,
+        lr=4e-3,
+        opt_func=torch.optim.Adam,
+    )
+
+
+def tunet():
+    from slowai.diffusion_unet import FashionDDPM, TUnet
+
+    return Scenario(
+        lambda: TUnet(
+            nfs=(32, 64, 128, 256), n_blocks=(2, 1, 1, 1, 1), color_channels=1
+        ),
+        lambda: [FashionDDPM(), MetricsCB()],
+        bare_step=diffusion_step(FashionDDPM()),
+        shape=(1, 32, 32),
+        learner_cls=Learner,
+        loss_func=F.mse_loss,
+        lr=4e-3,
+    )
+
+
+scenarios = dict(cnn=cnn, resnet=resnet, ddpm=ddpm, tunet=tunet)
+
+# %% ../nbs/98_benchmarks.ipynb 10
+def synchronize(device=def_device):
+    """Wait for the queued work on the device to finish"""
+    device = torch.device(device)
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+    elif device.type == "mps":
+        torch.mps.synchronize()
+
+
+class TimerCB(Callback, order=after(ProgressCB)):
+    """Time the training batches after the first `n_warmup`"""
+
+    def __init__(self, n_warmup=4, device=def_device):
+        fc.store_attr()
+        self.elapsed = None
+
+    def _start(self):
+        synchronize(self.device)
+        self.start = time.perf_counter()
+
+    def before_epoch(self, learn):
+        if self.n_warmup == 0:
+            self._start()
+
+    def after_batch(self, learn):
+        if learn.training and learn.iter == self.n_warmup - 1:
+            self._start()
+
+    def after_epoch(self, learn):
+        if learn.training:
+            synchronize(self.device)
+            self.elapsed = time.perf_counter() - self.start
+
+
+def time_bare(scenario, model, dl, n_warmup=4, device=def_device):
+    """Time a bare PyTorch training loop, without the `Learner`"""
+    model.to(device).train()
+    opt = scenario.opt_func(model.parameters(), scenario.lr)
+    for i, batch in enumerate(dl):
+        if i == n_warmup:
+            synchronize(device)
+            start = time.perf_counter()
+        batch = to_device(batch, device=device)
+        loss = scenario.bare_step(model, batch, scenario.loss_func)
+        loss.backward()
+        opt.step()
+        opt.zero_grad()
+    synchronize(device)
+    return time.perf_counter() - start
+
+# %% ../nbs/98_benchmarks.ipynb 11
+def run_scenario(scenario, bs=64, n_batches=32, n_warmup=4, device=def_device):
+    """Benchmark the `Learner` against a bare loop for one scenario"""
+    if isinstance(scenario, str):
+        scenario = scenarios[scenario]()
+    dls = synthetic_dls(scenario.shape, bs=bs, n_batches=n_warmup + n_batches)
+
+    torch.manual_seed(0)
+    bare = time_bare(scenario, scenario.model_f(), dls["train"], n_warmup, device)
+
+    torch.manual_seed(0)
+    timer = TimerCB(n_warmup, device)
+    cbs = [
+        *scenario.cbs_f(),
+        DeviceCB(device),
+        ProgressCB(),
+        BatchSchedulerCB(
+            lr_scheduler.OneCycleLR,
+            max_lr=scenario.lr,
+            total_steps=len(dls["train"]),
+        ),
+        timer,
+    ]
+    learn = scenario.learner_cls(
+        scenario.model_f(),
+        dls,
+        scenario.loss_func,
+        lr=scenario.lr,
+        cbs=cbs,
+        opt_func=scenario.opt_func,
+    )
+    learn.fit(1, valid=False)
+
+    ms_per_batch = 1000 * timer.elapsed / n_batches
+    bare_ms_per_batch = 1000 * bare / n_batches
+    return dict(
+        device=str(device),
+        bs=bs,
+        n_batches=n_batches,
+        samples_per_s=bs * n_batches / timer.elapsed,
+        ms_per_batch=ms_per_batch,
+        bare_ms_per_batch=bare_ms_per_batch,
+        overhead_ms_per_batch=ms_per_batch - bare_ms_per_batch,
+    )
+
+
+def bench(names=None, path=None, **kwargs):
+    """Run the benchmark `scenarios`, optionally saving the report as JSON"""
+    names = fc.L(names or list(scenarios))
+    results = {nm: run_scenario(nm, **kwargs) for nm in names}
+    if path is not None:
+        Path(path).write_text(json.dumps(results, indent=2))
+    return results
+
+
+def compare(results, baseline, tolerance=0.1):
+    """Compare the throughput of the `results` against a `baseline` report,
+    flagging drops of more than `tolerance` as regressions"""
+    if isinstance(baseline, (str, Path)):
+        baseline = json.loads(Path(baseline).read_text())
+    report = {}
+    for nm, r in results.items():
+        if nm not in baseline:
+            continue
+        b = baseline[nm]
+        change = r["samples_per_s"] / b["samples_per_s"] - 1
+        report[nm] = dict(
+            samples_per_s=r["samples_per_s"],
+            baseline_samples_per_s=b["samples_per_s"],
+            change=change,
+            regression=change < -tolerance,
+        )
+    return report
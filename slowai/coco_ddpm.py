@@ -115,7 +115,6 @@ def get_coco_dataset(
     fps = Path(fp).glob("**/*.jpg")
     dsd = coco_2017_trn(fps, n=n)
     dsd["train"].set_transform(partial(fac, pipe=trn))
-    dsd["train"] = dsd["train"].shuffle()
     dsd["test"] = (
         dsd["test"]
         .map(
@@ -42,10 +42,11 @@ pipe = [
 
 # %% ../nbs/13_ddpm.ipynb 7
 def get_dls(bs=128):
+    # Equivalent to `pipe`, but applied to whole batches at once
     return tensorize_images(
         DataLoaders.from_hf("fashion_mnist", bs=bs),
-        pipe=pipe,
-        normalize=False,  # 👈 ...and here
+        size=(32, 32),
+        normalize=([0.5], [1.0]),  # 👈 ...and here
     ).listify()
 
 # %% ../nbs/13_ddpm.ipynb 15
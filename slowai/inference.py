@@ -0,0 +1,242 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/31_inference.ipynb.
+
+# %% auto 0
+__all__ = ['homogeneous', 'inplace', 'views', 'is_batchnorm', 'bn_scale_shift', 'FoldingTracer', 'fold_into', 'only_user',
+           'fold_batchnorms', 'modifies', 'mutated', 'remove_clones', 'latency', 'optimize_for_inference',
+           'compare_latency']
+
+# %% ../nbs/31_inference.ipynb 2
+import copy
+import inspect
+import operator
+
+import torch
+import torch.nn.functional as F
+from torch import fx, nn
+from torch.utils import benchmark
+
+from .initializations import BatchNorm
+
+# %% ../nbs/31_inference.ipynb 4
+def is_batchnorm(m):
+    return isinstance(m, (nn.modules.batchnorm._BatchNorm, BatchNorm))
+
+
+def bn_scale_shift(bn):
+    """The per-channel scale and shift that an eval-mode batch norm applies"""
+    if isinstance(bn, BatchNorm):
+        s, t = bn.fold(bn.means, bn.vars)
+        return s.detach().flatten(), t.detach().flatten()
+    s = (bn.running_var + bn.eps).rsqrt()
+    if bn.weight is not None:
+        s = s * bn.weight
+    t = -bn.running_mean * s
+    if bn.bias is not None:
+        t = t + bn.bias
+    return s.detach(), t.detach()
+
+# %% ../nbs/31_inference.ipynb 6
+class FoldingTracer(fx.Tracer):
+    """Keep the layers that batch norms can be folded into as single nodes"""
+
+    def is_leaf_module(self, m, qualname):
+        if is_batchnorm(m):
+            return True
+        if type(m).forward in (nn.Conv2d.forward, nn.Linear.forward):
+            return True
+        return super().is_leaf_module(m, qualname)
+
+
+def fold_into(gm, node, s, t):
+    """Scale the outputs of the convolution or linear `node` by `s` and shift them by `t`"""
+    if node.op == "call_module":
+        owner = gm.get_submodule(node.target)
+        if not isinstance(owner, (nn.Conv2d, nn.Linear)):
+            return False
+        weight, bias = "weight", "bias"
+    elif (
+        node.op == "call_function"
+        and node.target in (F.conv2d, torch.conv2d)
+        and len(node.args) >= 3
+        and node.args[1].op == "get_attr"
+    ):
+        path, weight = node.args[1].target.rsplit(".", 1)
+        owner = gm.get_submodule(path)
+        b = node.args[2]
+        if b is None:
+            bias = "bias"
+        elif b.op == "get_attr" and b.target.rsplit(".", 1)[0] == path:
+            bias = b.target.rsplit(".", 1)[1]
+        else:
+            return False
+    else:
+        return False
+    with torch.no_grad():
+        w = getattr(owner, weight)
+        w.mul_(s.view(-1, *[1] * (w.dim() - 1)))
+        b = getattr(owner, bias, None)
+        setattr(owner, bias, nn.Parameter(t if b is None else b * s + t))
+    if node.op == "call_function" and node.args[2] is None:
+        with gm.graph.inserting_before(node):
+            b = gm.graph.get_attr(f"{path}.{bias}")
+        node.args = (*node.args[:2], b, *node.args[3:])
+    return True
+
+# %% ../nbs/31_inference.ipynb 8
+homogeneous = (F.relu, torch.relu, F.leaky_relu)
+
+
+def only_user(node, targets):
+    return (
+        node.op == "call_function" and node.target in targets and len(node.users) == 1
+    )
+
+
+def fold_batchnorms(gm):
+    """Fold every eval-mode batch norm in `gm` into the layer that precedes it"""
+    for node in list(gm.graph.nodes):
+        if node.op != "call_module" or not is_batchnorm(gm.get_submodule(node.target)):
+            continue
+        bn = gm.get_submodule(node.target)
+        s, t = bn_scale_shift(bn)
+        (src,) = node.args
+        if len(src.users) == 1 and fold_into(gm, src, s, t):
+            node.replace_all_uses_with(src)
+            gm.graph.erase_node(node)
+            continue
+        # Otherwise, fold through a homogeneous activation and a constant shift
+        if not isinstance(bn, (nn.BatchNorm2d, BatchNorm)) or not (s > 0).all():
+            continue
+        act, c = src, 0.0
+        if only_user(act, (operator.sub,)) and isinstance(act.args[1], (int, float)):
+            act, c = act.args[0], act.args[1]
+        if not only_user(act, homogeneous) or act.kwargs.get("inplace"):
+            continue
+        z = act.args[0]
+        if len(z.users) != 1 or not fold_into(gm, z, s, torch.zeros_like(t)):
+            continue
+        name = node.target.replace(".", "_") + "_shift"
+        gm.register_buffer(name, (t - s * c).view(-1, 1, 1))
+        with gm.graph.inserting_after(node):
+            shift = gm.graph.get_attr(name)
+        with gm.graph.inserting_after(shift):
+            add = gm.graph.call_function(operator.add, (act, shift))
+        node.replace_all_uses_with(add)
+        gm.graph.erase_node(node)
+        if src is not act:
+            gm.graph.erase_node(src)
+    return gm
+
+# %% ../nbs/31_inference.ipynb 10
+inplace = (
+    operator.iadd,
+    operator.isub,
+    operator.imul,
+    operator.itruediv,
+    operator.setitem,
+)
+views = {
+    "view",
+    "view_as",
+    "reshape",
+    "flatten",
+    "squeeze",
+    "unsqueeze",
+    "transpose",
+    "permute",
+    "expand",
+    "narrow",
+    "t",
+}
+
+
+def modifies(gm, user):
+    """Whether `user` might modify any of its inputs in place"""
+    if user.op == "call_module":
+        return getattr(gm.get_submodule(user.target), "inplace", False)
+    if user.op == "call_function":
+        try:
+            kwargs = (
+                inspect.signature(user.target).bind(*user.args, **user.kwargs).arguments
+            )
+        except (TypeError, ValueError):
+            kwargs = user.kwargs
+        if kwargs.get("inplace") or kwargs.get("out") is not None:
+            return True
+        return user.target in inplace or getattr(user.target, "__name__", "").endswith(
+            "_"
+        )
+    return user.kwargs.get("inplace", False)
+
+
+def mutated(gm, node):
+    """Whether any user of `node`, or of a view of it, might modify it in place"""
+    for user in node.users:
+        if modifies(gm, user):
+            return True
+        if (
+            user.op == "call_method"
+            and user.target.endswith("_")
+            and user.args[0] is node
+        ):
+            return True
+        if user.op == "call_method" and user.target in views and mutated(gm, user):
+            return True
+        if (
+            user.op == "call_function"
+            and user.target in (operator.getitem, torch.flatten)
+            and mutated(gm, user)
+        ):
+            return True
+    return False
+
+
+def remove_clones(gm):
+    """Drop the clones in `gm` that guard against mutations that never happen"""
+    for node in list(gm.graph.nodes):
+        if node.op != "call_method" or node.target != "clone" or node.kwargs:
+            continue
+        (src,) = node.args
+        if not mutated(gm, node) and not mutated(gm, src):
+            node.replace_all_uses_with(src)
+            gm.graph.erase_node(node)
+    return gm
+
+# %% ../nbs/31_inference.ipynb 14
+def latency(model, example, min_run_time=2.0):
+    """Median milliseconds per forward pass on `example`"""
+    with torch.no_grad():
+        model(example)
+        timer = benchmark.Timer("model(x)", globals={"model": model, "x": example})
+        return timer.blocked_autorange(min_run_time=min_run_time).median * 1e3
+
+
+def optimize_for_inference(model, example, min_run_time=0.2):
+    """Fold the batch norms of `model`, drop redundant clones and compile the
+    result into a frozen TorchScript module, traced on `example`"""
+    model = copy.deepcopy(model).eval()
+    gm = fx.GraphModule(model, FoldingTracer().trace(model))
+    fold_batchnorms(gm)
+    remove_clones(gm)
+    gm.graph.eliminate_dead_code()
+    gm.delete_all_unused_submodules()
+    gm.recompile()
+    with torch.no_grad():
+        frozen = torch.jit.freeze(torch.jit.trace(gm, example))
+        fused = torch.jit.optimize_for_inference(
+            torch.jit.freeze(torch.jit.trace(gm, example))
+        )
+    return min([frozen, fused], key=lambda m: latency(m, example, min_run_time))
+
+# %% ../nbs/31_inference.ipynb 15
+def compare_latency(model, example, min_run_time=2.0):
+    """Latency of `model` before and after `optimize_for_inference`"""
+    model = model.eval()
+    fast = optimize_for_inference(model, example)
+    with torch.no_grad():
+        err = (model(example) - fast(example)).abs().max().item()
+    before = latency(model, example, min_run_time)
+    after = latency(fast, example, min_run_time)
+    return dict(
+        before_ms=before, after_ms=after, speedup=before / after, max_abs_err=err
+    )
@@ -1,8 +1,8 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/09_initializations.ipynb.
 
 # %% auto 0
-__all__ = ['C', 'BatchTransformCB', 'NormalizeBatchCB', 'GeneralReLU', 'init_leaky_weights', 'LSUVHook', 'LSUVInitialization',
-           'Conv2dGeneral', 'BatchNorm', 'CNNWithGeneralReLUAndBatchNorm']
+__all__ = ['C', 'BatchTransformCB', 'NormalizeBatchCB', 'GeneralReLU', 'init_leaky_weights', 'StopForward', 'LSUVHook',
+           'LSUVInitialization', 'Conv2dGeneral', 'BatchNorm', 'CNNWithGeneralReLUAndBatchNorm']
 
 # %% ../nbs/09_initializations.ipynb 3
 import math
@@ -33,11 +33,12 @@ from slowai.learner import (
     MomentumCB,
     ProgressCB,
     TrainLearner,
+    after,
     fashion_mnist,
     to_cpu,
 )
 
-# %% ../nbs/09_initializations.ipynb 39
+# %% ../nbs/09_initializations.ipynb 41
 class BatchTransformCB(Callback):
     """Arbitrarily transform a batch"""
 
@@ -48,20 +49,66 @@ class BatchTransformCB(Callback):
         if (self.on_train and learn.training) or (self.on_val and not learn.training):
             learn.batch = self.tfm(learn.batch)
 
-# %% ../nbs/09_initializations.ipynb 40
-class NormalizeBatchCB(BatchTransformCB):
-    """Unit normalize a batch"""
+# %% ../nbs/09_initializations.ipynb 42
+class NormalizeBatchCB(BatchTransformCB, order=after(DeviceCB)):
+    """Unit normalize a batch
 
-    def __init__(self, on_train=True, on_val=True):
+    By default, each batch is normalized by its own mean and standard deviation.
+    Given per-channel dataset `stats`, as a `(mean, std)` pair on the 0-1 scale,
+    or a `momentum` to track them as an exponential moving average of the
+    training batches, uint8 batches are instead converted and normalized in a
+    single multiply-add once `DeviceCB` has moved them."""
+
+    def __init__(self, on_train=True, on_val=True, stats=None, momentum=None):
         fc.store_attr()
+        self.mean = self.var = None
+        self.update = False
+        self.affines = {}
+        if stats is not None:
+            mean, std = stats
+            self.mean = tensor(mean, dtype=torch.float32).view(-1, 1, 1)
+            self.var = tensor(std, dtype=torch.float32).view(-1, 1, 1) ** 2
+
+    def before_batch(self, learn):
+        self.update = learn.training and self.momentum is not None
+        super().before_batch(learn)
+
+    def track(self, xb):
+        """Update the running statistics with a batch"""
+        x = xb.float()
+        if xb.dtype == torch.uint8:
+            x = x.div_(255)
+        var, mean = torch.var_mean(x, (0, 2, 3), correction=0)
+        mean, var = mean.view(-1, 1, 1), var.view(-1, 1, 1)
+        if self.mean is None:
+            self.mean, self.var = mean, var
+        else:
+            self.mean, self.var = self.mean.to(x.device), self.var.to(x.device)
+            self.mean.lerp_(mean, self.momentum)
+            self.var.lerp_(var, self.momentum)
+        self.affines = {}
+
+    def affine(self, xb):
+        """The scale and shift that normalize `xb`"""
+        key = xb.dtype, xb.device
+        if key not in self.affines:
+            std = self.var.to(xb.device).sqrt()
+            scale = 1 / (255 * std) if xb.dtype == torch.uint8 else 1 / std
+            self.affines[key] = scale, -self.mean.to(xb.device) / std
+        return self.affines[key]
 
     def tfm(self, batch):
         xb, *other = batch
-        mu = xb.mean()
-        sigma = xb.std()
-        return (xb - mu) / sigma, *other
+        if self.stats is None and self.momentum is None:
+            mu = xb.mean()
+            sigma = xb.std()
+            return (xb - mu) / sigma, *other
+        if self.update or self.mean is None:
+            self.track(xb)
+        scale, shift = self.affine(xb)
+        return torch.addcmul(shift, xb, scale), *other
 
-# %% ../nbs/09_initializations.ipynb 44
+# %% ../nbs/09_initializations.ipynb 49
 class GeneralReLU(nn.Module):
     """Generalized ReLU activation function with normalization and leakiness"""
 
@@ -82,37 +129,81 @@ class GeneralReLU(nn.Module):
             x.clamp_max_(self.max_)
         return x
 
-# %% ../nbs/09_initializations.ipynb 49
+# %% ../nbs/09_initializations.ipynb 54
 def init_leaky_weights(module, leak=0.0):
     if isinstance(module, (nn.Conv2d,)):
         init.kaiming_normal_(module.weight, a=leak)  # 👈 weirdly, called `a` here
 
-# %% ../nbs/09_initializations.ipynb 55
+# %% ../nbs/09_initializations.ipynb 60
+class StopForward(Exception):
+    """Abort a forward pass once the layer of interest has run"""
+
+
 class LSUVHook(Hook):
-    """An abstract hook for performing LSUV for a single layer. `.normalize()`
-    needs to be implemented for the specific layers"""
+    """A hook for performing LSUV for a single layer. `.normalize()` rescales
+    the last layer with weights, which may be overridden with `.affine()`"""
 
     def __init__(self, m, tol=1e-3):
         self.mean = None
         self.std = None
         self.tol = tol
+        self.inputs = None
+        self.truncate = False
+
+        def cache_inputs(module, args, kwargs):
+            self.inputs = args, kwargs
 
         def append_moments(module, _, activations):
             activations = to_cpu(activations)
             self.mean = activations.mean()
             self.std = activations.std()
+            if self.truncate:
+                raise StopForward
 
+        self.pre_hook = m.register_forward_pre_hook(cache_inputs, with_kwargs=True)
         self.hook = m.register_forward_hook(append_moments)
         self.m = m
 
+    def remove(self):
+        self.pre_hook.remove()
+        super().remove()
+
+    def prefix_forward(self, model, xb):
+        """Run `model` only as far as this layer, caching its inputs"""
+        self.truncate = True
+        try:
+            model(xb)
+        except StopForward:
+            pass
+        finally:
+            self.truncate = False
+
+    def forward(self):
+        """Rerun this layer alone, on its cached inputs"""
+        args, kwargs = self.inputs
+        # Copy, in case the layer modifies its inputs in place
+        args = [a.clone() if isinstance(a, torch.Tensor) else a for a in args]
+        self.m(*args, **kwargs)
+
     def normalized(self):
-        assert self.mean and self.std, "Attempted normalization before processing data"
+        assert self.mean is not None, "Attempted normalization before processing data"
         return abs(self.mean) <= self.tol and abs(self.std - 1) <= self.tol
 
-    def normalize(self):
-        raise NotImplementedError
+    def affine(self):
+        """The layer to rescale"""
+        return [m for m in self.m.modules() if getattr(m, "weight", None) is not None][
+            -1
+        ]
 
-# %% ../nbs/09_initializations.ipynb 57
+    def normalize(self):
+        # Exact in a single step if nothing nonlinear follows the affine layer
+        layer = self.affine()
+        layer.weight.data /= self.std
+        if getattr(layer, "bias", None) is not None:
+            layer.bias.data -= self.mean
+            layer.bias.data /= self.std
+
+# %% ../nbs/09_initializations.ipynb 61
 class LSUVInitialization(HooksCallback):
     """Layer wise sequential unit variance initialization"""
 
@@ -132,27 +223,29 @@ class LSUVInitialization(HooksCallback):
             trn = learn.dls["train"]
             xb, *_ = next(iter(trn))
             xb = to_device(xb)
-            super().before_fit(learn)
             with torch.no_grad():
                 for i, h in enumerate(self.hooks):
-                    for n_batches in range(1_000):
-                        learn.model(xb)
-                        if not h.normalized():
-                            h.normalize()
-                        else:
+                    # The earlier layers are already normalized, so the inputs
+                    # of this one are fixed and only it needs to be rerun
+                    h.prefix_forward(learn.model, xb)
+                    for n_iters in range(1_000):
+                        if h.normalized():
                             print(
-                                f"Layer {i} normalized after {n_batches} batches ({h.mean:.2f}, {h.std:.2f})"
+                                f"Layer {i} normalized after {n_iters} iterations ({h.mean:.2f}, {h.std:.2f})"
                             )
                             break
+                        h.normalize()
+                        h.forward()
                     else:
                         raise ValueError("Initialization failed!")
+                    h.inputs = None
         finally:
             # We don't need these hooks anymore, so we can get rid of them
             # before beginning training
             self.cleanup_fit(learn)
             self.hooks = []
 
-# %% ../nbs/09_initializations.ipynb 63
+# %% ../nbs/09_initializations.ipynb 69
 class Conv2dGeneral(nn.Module):
     """Convolutional neural network with a built in activation"""
 
@@ -183,12 +276,15 @@ class Conv2dGeneral(nn.Module):
             x = self.norm(x)
         return x
 
-# %% ../nbs/09_initializations.ipynb 64
+# %% ../nbs/09_initializations.ipynb 70
 C = Conv2dGeneral
 
-# %% ../nbs/09_initializations.ipynb 68
+# %% ../nbs/09_initializations.ipynb 74
 class BatchNorm(nn.Module):
-    """Batch normalization"""
+    """Batch normalization
+
+    The normalization, scale and shift are folded into one multiply-add over
+    the activations"""
 
     def __init__(self, num_filters, mom=0.1, eps=1e-5):
         super().__init__()
@@ -202,25 +298,39 @@ class BatchNorm(nn.Module):
         self.register_buffer("means", torch.zeros(1, num_filters, 1, 1))
 
     def update_stats(self, x):
-        bs, c, h, w = x.shape
         m = x.mean((0, 2, 3), keepdim=True)
-        v = x.var((0, 2, 3), keepdim=True)
+        d = x - m
+        v = d.mul_(d).sum((0, 2, 3), keepdim=True) / (d.numel() // d.shape[1] - 1)
 
         # Update with an exponentially moving average
         self.means.lerp_(m, self.mom)
         self.vars.lerp_(v, self.mom)
         return m, v
 
+    def fold(self, m, v):
+        """The per-channel scale and shift equivalent to normalizing with `m`
+        and `v`, then applying `mults` and `adds`"""
+        scale = self.mults * (v + self.eps).rsqrt()
+        return scale, self.adds - m * scale
+
     def forward(self, x):
         if self.training:
             with torch.no_grad():
                 m, v = self.update_stats(x)
+            scale, shift = self.fold(m, v)
+            return torch.addcmul(shift, x, scale)
         else:
-            m, v = self.means, self.vars
-        x = (x - m) / (v + self.eps).sqrt()
-        return x * self.mults + self.adds
-
-# %% ../nbs/09_initializations.ipynb 73
+            # The native kernel folds the running statistics the same way
+            return F.batch_norm(
+                x,
+                self.means.flatten(),
+                self.vars.flatten(),
+                self.mults.flatten(),
+                self.adds.flatten(),
+                eps=self.eps,
+            )
+
+# %% ../nbs/09_initializations.ipynb 81
 class CNNWithGeneralReLUAndBatchNorm(nn.Module):
     """Six layer convolutional neural network with GeneralRelU"""
 
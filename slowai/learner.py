@@ -1,29 +1,50 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/07_learner.ipynb.
 
 # %% auto 0
-__all__ = ['pipe', 'to_tensor', 'DataLoaders', 'batchify', 'tensorize_images', 'CancelFitException', 'CancelBatchException',
-           'CancelEpochException', 'Callback', 'with_cbs', 'only', 'Learner', 'TrainCB', 'MetricsCB', 'DeviceCB',
-           'after', 'before', 'ProgressCB', 'to_cpu', 'fashion_mnist', 'TrainLearner', 'MomentumCB', 'LRFinderCB',
-           'lr_find']
+__all__ = ['cache_dir', 'pipe', 'to_tensor', 'cache_key', 'atomic_write', 'DatasetCache', 'EpochBatchSampler',
+           'StreamingDataLoader', 'SkipBatches', 'skip_batches', 'DataLoaders', 'batchify', 'ImageBatch', 'image_stats',
+           'tensorize_images', 'TensorStore', 'from_tensor_store', 'batch_size', 'untransformed', 'fetch',
+           'stage_times', 'stream_stage_times', 'loader_throughput', 'benchmark', 'CancelFitException',
+           'CancelBatchException', 'CancelEpochException', 'Callback', 'with_cbs', 'only', 'split_batch', 'cat_batch',
+           'mark_last', 'Learner', 'TrainCB', 'MetricsCB', 'DeviceCB', 'after', 'before', 'ProgressCB', 'to_cpu',
+           'fashion_mnist', 'TrainLearner', 'MomentumCB', 'LRFinderCB', 'lr_find', 'lr_find_parallel', 'ProfileCB',
+           'snapshot', 'rng_state', 'set_rng_state', 'CheckpointCB']
 
 # %% ../nbs/07_learner.ipynb 3
+import hashlib
+import itertools
+import json
 import math
 import multiprocessing
+import os
+import random
+import shutil
 import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import copy, deepcopy
-from functools import lru_cache, partial
+from functools import partial
 from pathlib import Path
 from typing import Mapping, Sequence, Type, Union
 
+import datasets
 import fastcore.all as fc
 import matplotlib.pyplot as plt
+import numpy as np
+import pyarrow.compute as pc
 import torch
 import torch.nn.functional as F
 import torchmetrics
+import torchvision
 import torchvision.transforms as T
+import torchvision.transforms.functional as TF
 from datasets import load_dataset, load_from_disk
+from datasets.fingerprint import Hasher
 from fastprogress import master_bar, progress_bar
 from IPython.utils import io
+from PIL import Image
 from torch import optim
 from torch.optim.lr_scheduler import ExponentialLR
 from torch.utils.data import DataLoader, default_collate
@@ -32,9 +53,183 @@ from .autoencoders import get_model as get_ae_model
 from .convs import def_device, fit, to_device
 from .utils import Suppressor, show_images
 
-# %% ../nbs/07_learner.ipynb 6
+# %% ../nbs/07_learner.ipynb 7
+cache_dir = Path.home() / ".cache" / "slowai"
+
+
+def cache_key(*parts):
+    """A short, stable name for a cache entry determined by `parts`"""
+    return hashlib.sha256("-".join(map(str, parts)).encode()).hexdigest()[:16]
+
+
+@contextmanager
+def atomic_write(path, is_dir=False):
+    """Yield a temporary path next to `path` to write a file (or directory) to,
+    then move it into place in one step. A directory that another process
+    finished writing first is kept instead"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if is_dir:
+        tmp = Path(tempfile.mkdtemp(dir=path.parent, prefix=".tmp-"))
+    else:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        yield tmp
+        if is_dir:
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                if not path.exists():
+                    raise
+        else:
+            os.replace(tmp, path)
+    finally:
+        if tmp.is_dir():
+            shutil.rmtree(tmp, ignore_errors=True)
+        else:
+            tmp.unlink(missing_ok=True)
+
+# %% ../nbs/07_learner.ipynb 9
+class DatasetCache:
+    """Persistent, content-addressed cache of datasets serialized to Arrow.
+    The least recently used entries are evicted to stay under `max_bytes`"""
+
+    def __init__(
+        self,
+        dir_=cache_dir / "datasets",
+        max_bytes=20 * 2**30,
+    ):
+        self.dir = Path(dir_)
+        self.max_bytes = max_bytes
+
+    def key(self, ds, split):
+        # Not `ds._fingerprint`, which changes with every transform, although
+        # the copy only holds the underlying data. Memory-mapped tables hash by
+        # their files, so this is cheap for datasets loaded from disk
+        return cache_key(Hasher.hash((ds._data, ds._indices, ds.features)), split)
+
+    def __call__(self, ds, split):
+        """Load a memory-mapped copy of `ds`, serializing it if neccesary"""
+        ds_format = copy(ds.format)
+        dir_ = self.dir / self.key(ds, split)
+        if not dir_.exists():
+            self.save(ds, dir_)
+            self.evict(keep=dir_)
+        # Mark the entry as recently used
+        os.utime(dir_)
+        return load_from_disk(dir_).with_format(**ds_format)
+
+    def save(self, ds, dir_):
+        # Doesn't matter which format, but needs to be serializable
+        ds = ds.with_format("torch")
+        with atomic_write(dir_, is_dir=True) as tmp:
+            if fc.IN_JUPYTER:
+                with io.capture_output():
+                    ds.save_to_disk(tmp)
+            else:
+                ds.save_to_disk(tmp)
+
+    def entries(self):
+        """Cached entries, from least to most recently used"""
+        if not self.dir.exists():
+            return []
+        entries = [p for p in self.dir.iterdir() if not p.name.startswith(".")]
+        return sorted(entries, key=lambda p: p.stat().st_mtime)
+
+    @staticmethod
+    def nbytes(dir_):
+        return sum(f.stat().st_size for f in dir_.rglob("*") if f.is_file())
+
+    def evict(self, keep=None):
+        """Remove the least recently used entries until under budget"""
+        entries = self.entries()
+        sizes = {p: self.nbytes(p) for p in entries}
+        total = sum(sizes.values())
+        for p in entries:
+            if total <= self.max_bytes:
+                break
+            if p != keep:
+                shutil.rmtree(p, ignore_errors=True)
+                total -= sizes[p]
+
+# %% ../nbs/07_learner.ipynb 11
+class EpochBatchSampler:
+    """Batches of indices, reshuffled every epoch from a seed and sorted
+    within each batch for locality"""
+
+    def __init__(self, n, bs, shuffle=True, seed=0, drop_last=False):
+        fc.store_attr()
+        self.epoch = 0  # Epoch of the next pass
+        self.start = 0  # Batch at which to start the next pass
+
+    def set_epoch(self, epoch, start=0):
+        self.epoch = epoch
+        self.start = start
+
+    def __len__(self):
+        if self.drop_last:
+            return self.n // self.bs
+        return math.ceil(self.n / self.bs)
+
+    def order(self, epoch):
+        if not self.shuffle:
+            return np.arange(self.n)
+        return np.random.default_rng([self.seed, epoch]).permutation(self.n)
+
+    def __iter__(self):
+        epoch, start = self.epoch, self.start
+        self.epoch, self.start = epoch + 1, 0
+        order = self.order(epoch)
+        for i in range(start, len(self)):
+            yield np.sort(order[i * self.bs : (i + 1) * self.bs]).tolist()
+
+
+class StreamingDataLoader(DataLoader):
+    """Reshuffle the shards and buffer of a streaming dataset on every pass"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.epoch = 0  # Epoch of the next pass
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def __iter__(self):
+        # Shared with persistent workers by `datasets`
+        self.dataset.set_epoch(self.epoch)
+        self.epoch += 1
+        return super().__iter__()
+
+
+class SkipBatches:
+    """Skip the first `n` batches of a loader"""
+
+    def __init__(self, dl, n):
+        fc.store_attr()
+
+    def __iter__(self):
+        return itertools.islice(self.dl, self.n, None)
+
+    def __len__(self):
+        return len(self.dl) - self.n
+
+
+def skip_batches(dl, n):
+    """Skip the first `n` batches, without loading them if the sampler allows"""
+    sampler = getattr(dl, "batch_sampler", None)
+    if isinstance(sampler, EpochBatchSampler):
+        sampler.start = n
+        return SkipBatches(dl, 0)
+    return SkipBatches(dl, n)
+
+# %% ../nbs/07_learner.ipynb 12
 class DataLoaders:
-    """Wrapper around huggingface datasets to facilitate raw pytorch work"""
+    """Wrapper around huggingface datasets to facilitate raw pytorch work
+
+    The loaders for each split, and their worker processes, are kept alive
+    across epochs and fits until `close()` is called. Iterable (streaming)
+    datasets are shuffled with a bounded buffer and split across the workers
+    by shard."""
 
     def __init__(
         self,
@@ -42,29 +237,70 @@ class DataLoaders:
         nworkers: int = multiprocessing.cpu_count() // 2,
         bs=32,
         collate_fn=default_collate,
-        tdir=tempfile.TemporaryDirectory().name,
+        cache=None,
+        prefetch_factor=2,
+        pin_memory=False,
+        persistent_workers=True,
+        shuffle=True,
+        seed=0,
+        shuffle_buffer=10_000,
     ):
         self.splits = splits
         self.nworkers = nworkers
         self.bs = bs
         self.collate_fn = collate_fn
-        self.tdir = tdir
+        self.cache = DatasetCache() if cache is None else cache
+        self.prefetch_factor = prefetch_factor
+        self.pin_memory = pin_memory
+        self.persistent_workers = persistent_workers
+        self.shuffle = shuffle
+        self.seed = seed
+        self.shuffle_buffer = shuffle_buffer
+        self.columns = None
+        self.stats = None
+        self.loaders = {}
 
     @classmethod
     def from_dsd(cls, dsd, **kwargs):
         return cls(splits=dsd, **kwargs)
 
     @classmethod
-    def from_hf(cls, dataset_id, **kwargs):
-        dsd = load_dataset(dataset_id)
+    def from_hf(cls, dataset_id, streaming=False, **kwargs):
+        dsd = load_dataset(dataset_id, streaming=streaming)
         return cls.from_dsd(dsd, **kwargs)
 
-    def with_transforms(self, ts, batched=True, lazy=False, splits=None):
+    @property
+    def streaming(self):
+        return isinstance(self.splits, datasets.IterableDatasetDict)
+
+    @staticmethod
+    def decoding(ds, features, decode=True):
+        """Cast the image `features` of `ds` to be decoded into PIL images, or
+        to be left as the encoded bytes"""
+        for feature in features:
+            ft = (ds.features or {}).get(feature)
+            if isinstance(ft, datasets.Image) and ft.decode != decode:
+                ds = ds.cast_column(feature, datasets.Image(decode=decode))
+        return ds
+
+    def with_transforms(self, ts, batched=True, lazy=False, splits=None, decode=True):
         def map_(batch):
             for feature, transform in ts.items():
                 batch[feature] = transform(batch[feature])
             return batch
 
+        # Running workers hold a copy of the untransformed datasets
+        self.close()
+
+        if self.streaming:
+            # Mapping a stream is lazy anyway, but it forgets the features
+            self.columns = self.columns or list(self.splits["train"].features)
+            lazy = False
+
+        # Transforms receive PIL images, unless they ask for the encoded bytes
+        for split in self.splits if splits is None else splits:
+            self.splits[split] = self.decoding(self.splits[split], ts, decode)
+
         # TODO: use a function here
         if splits is None:
             if lazy:
@@ -87,12 +323,14 @@ class DataLoaders:
     def listify(self, columns=None):
         """Yield a list instead of a dictionary"""
         if columns is None:
-            columns = self.splits["train"].features
+            columns = self.splits["train"].features or self.columns
 
         s = copy(self)
+        s.loaders = {}
+        collate = self.collate_fn
 
         def collate_fn(examples):
-            cols = default_collate(examples)
+            cols = collate(examples)
             return [cols[f] for f in columns]
 
         s.collate_fn = collate_fn
@@ -101,34 +339,73 @@ class DataLoaders:
     def get_unique_outputs(self, column):
         outputs = set()
         for _, split in self.splits.items():
-            for row in split:
-                output = row[column]
-                if isinstance(output, torch.Tensor):
-                    output = output.item()
-                outputs.add(output)
+            if isinstance(split, TensorStore):
+                outputs.update(split.unique(column))
+            elif isinstance(split, datasets.IterableDataset):
+                # Avoid streaming the whole split, if we can
+                feature = (split.features or {}).get(column)
+                if isinstance(feature, datasets.ClassLabel):
+                    outputs.update(range(feature.num_classes))
+                else:
+                    outputs.update(row[column] for row in split)
+            elif column in split.column_names:
+                # Use the raw Arrow column, rather than decoding and transforming
+                # every row
+                col = split.data.column(column)
+                if split._indices is not None:
+                    col = col.take(split._indices.column(0))
+                outputs.update(pc.unique(col).to_pylist())
+            else:
+                for row in split:
+                    output = row[column]
+                    if isinstance(output, torch.Tensor):
+                        output = output.item()
+                    outputs.add(output)
         return sorted(outputs)
 
+    def generator(self):
+        # Creating an iterator draws the workers' base seed. Drawing it from the
+        # global RNG would make the training depend on when the iterators are
+        # created, which differs between a run and its resumption with
+        # persistent workers
+        return torch.Generator().manual_seed(self.seed)
+
     def dl(self, split, nworkers=None):
         ds = self.splits[split]
         nworkers = self.nworkers if nworkers is None else nworkers
-        if nworkers > 0:
-            ds_format = copy(ds.format)
-            dsd = ds.with_format(
-                "torch"
-            )  # Doesn't matter which format, but needs to be serializable
-            dir_ = Path(self.tdir) / split
-            if not dir_.exists():
-                if fc.IN_JUPYTER:
-                    with io.capture_output():
-                        dsd.save_to_disk(dir_)
-                else:
-                    dsd.save_to_disk(dir_)
-            ds = load_from_disk(dir_).with_format(**ds_format)
+        shuffle = self.shuffle and split == "train"
+        if isinstance(ds, datasets.IterableDataset):
+            return self.streaming_dl(ds, nworkers, shuffle)
+        if nworkers > 0 and isinstance(ds, datasets.Dataset):
+            ds = self.cache(ds, split)
+        # Only the training split is shuffled, but every split benefits from
+        # fetching each batch at once
+        sampler = EpochBatchSampler(len(ds), self.bs, shuffle=shuffle, seed=self.seed)
         return DataLoader(
+            ds,
+            batch_sampler=sampler,
+            collate_fn=self.collate_fn,
+            num_workers=nworkers,
+            pin_memory=self.pin_memory,
+            prefetch_factor=self.prefetch_factor if nworkers > 0 else None,
+            persistent_workers=self.persistent_workers and nworkers > 0,
+            generator=self.generator(),
+        )
+
+    def streaming_dl(self, ds, nworkers, shuffle):
+        if shuffle:
+            ds = ds.shuffle(seed=self.seed, buffer_size=self.shuffle_buffer)
+        # Each worker streams whole shards, so extra workers would sit idle
+        nworkers = min(nworkers, ds.n_shards)
+        return StreamingDataLoader(
             ds,
             batch_size=self.bs,
             collate_fn=self.collate_fn,
             num_workers=nworkers,
+            pin_memory=self.pin_memory,
+            prefetch_factor=self.prefetch_factor if nworkers > 0 else None,
+            persistent_workers=self.persistent_workers and nworkers > 0,
+            generator=self.generator(),
         )
 
     def peek(self, split="train"):
@@ -136,11 +413,27 @@ class DataLoaders:
         batch = next(iter(dl))
         return batch
 
-    @lru_cache
     def __getitem__(self, split):
-        return self.dl(split)
+        if split not in self.loaders:
+            self.loaders[split] = self.dl(split)
+        return self.loaders[split]
+
+    def close(self):
+        """Shut down the worker processes"""
+        for dl in self.loaders.values():
+            # Persistent workers are owned by the loader's iterator
+            if dl._iterator is not None:
+                dl._iterator._shutdown_workers()
+                dl._iterator = None
+        self.loaders = {}
+
+    def __enter__(self):
+        return self
 
-# %% ../nbs/07_learner.ipynb 10
+    def __exit__(self, *args):
+        self.close()
+
+# %% ../nbs/07_learner.ipynb 16
 pipe = [T.PILToTensor(), T.ConvertImageDtype(torch.float)]
 to_tensor = T.Compose(pipe)
 
@@ -155,21 +448,474 @@ def batchify(f):
     return inner_
 
 
-def tensorize_images(dls, feature="image", normalize=True, pipe=pipe):
-    """Tensorize and normalize the image feature"""
-    if normalize:
-        # Sample 100 images to estimate the mean and standard deviation
-        imgs = dls.splits["train"].shuffle()[:100][feature]
-        pixels = torch.stack([to_tensor(img) for img in imgs]).view(-1)
-        mu = pixels.mean()
-        sigma = pixels.std()
-        to_norm_tensor = T.Compose([*pipe, T.Normalize([mu], [sigma])])
+class ImageBatch:
+    """Decode a batch of PIL images, or encoded image bytes, into one uint8
+    tensor, then resize, convert and normalize the whole batch at once
+
+    Every image is converted to `channels` channels, by default those of the
+    first image of the batch, and images of a different size from the first
+    are resized to match it before the whole batch is resized. With `uint8`,
+    the batch is left unconverted, to be normalized on arrival at the device
+    instead."""
+
+    decode_s = 0.0  # Seconds spent decoding in this process, for `stage_times`
+    modes = {
+        1: ("L", torchvision.io.ImageReadMode.GRAY),
+        2: ("LA", torchvision.io.ImageReadMode.GRAY_ALPHA),
+        3: ("RGB", torchvision.io.ImageReadMode.RGB),
+        4: ("RGBA", torchvision.io.ImageReadMode.RGB_ALPHA),
+    }
+
+    def __init__(self, size=None, mean=None, std=None, uint8=False, channels=None):
+        self.size = size
+        self.mean = mean
+        self.std = std
+        self.uint8 = uint8
+        self.channels = channels
+        if mean is not None:
+            self.mean_ = torch.tensor(mean).view(-1, 1, 1)
+            self.std_ = torch.tensor(std).view(-1, 1, 1)
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(size={self.size}, mean={self.mean}, std={self.std}, "
+            f"channels={self.channels})"
+        )
 
-        return dls.with_transforms({feature: batchify(to_norm_tensor)}, lazy=True)
+    @staticmethod
+    def as_hwc(image, channels=None):
+        """An image as a uint8 HWC tensor, converted to `channels` channels"""
+        if isinstance(image, dict):
+            # An undecoded `datasets.Image`, i.e., the raw bytes from Arrow, or
+            # the path of the file if the bytes were not embedded
+            if image["bytes"] is None:
+                image = Path(image["path"]).read_bytes()
+            else:
+                image = image["bytes"]
+        if isinstance(image, bytes):
+            mode = torchvision.io.ImageReadMode.UNCHANGED
+            if channels is not None:
+                mode = ImageBatch.modes[channels][1]
+            x = torchvision.io.decode_image(
+                torch.frombuffer(bytearray(image), dtype=torch.uint8), mode=mode
+            )
+            return x.permute(1, 2, 0)
+        if channels is not None and isinstance(image, Image.Image):
+            mode = ImageBatch.modes[channels][0]
+            if image.mode != mode:
+                image = image.convert(mode)
+        x = torch.from_numpy(np.asarray(image))
+        return x if x.ndim == 3 else x[..., None]
+
+    def decode(self, images):
+        """Copy the images into a single preallocated tensor"""
+        start = time.perf_counter()
+        first = self.as_hwc(images[0], self.channels)
+        x = torch.empty((len(images), *first.shape), dtype=torch.uint8)
+        x[0] = first
+        h, w, c = first.shape
+        for i, image in enumerate(images[1:], 1):
+            o = self.as_hwc(image, c)
+            if o.shape[:2] != (h, w):
+                o = TF.resize(o.permute(2, 0, 1), [h, w], antialias=True).permute(
+                    1, 2, 0
+                )
+            x[i] = o
+        ImageBatch.decode_s += time.perf_counter() - start
+        return x.permute(0, 3, 1, 2)
+
+    def resize(self, x):
+        if self.size is not None:
+            x = TF.resize(x, self.size, antialias=True)
+        return x
+
+    def convert(self, x):
+        """Convert a uint8 batch to normalized floats"""
+        x = x.float().div_(255)
+        if self.mean is not None:
+            x = x.sub_(self.mean_).div_(self.std_)
+        return x.contiguous()
+
+    def __call__(self, images):
+        x = self.resize(self.decode(images))
+        return x.contiguous() if self.uint8 else self.convert(x)
+
+
+def image_stats(
+    ds,
+    feature="image",
+    pipe=None,
+    size=None,
+    bs=1024,
+    nworkers=multiprocessing.cpu_count() // 2,
+    cache_dir=cache_dir / "stats",
+):
+    """Exact per-channel mean and standard deviation of an image feature,
+    computed in a single pass and cached by the dataset fingerprint
+
+    The images are tensorized with `ImageBatch`, unless a per-image `pipe`
+    of torchvision transforms is given."""
+    tfm = ImageBatch(size) if pipe is None else batchify(T.Compose(pipe))
+    key = cache_key(ds._fingerprint, feature, tfm if pipe is None else T.Compose(pipe))
+    fp = Path(cache_dir) / f"{key}.json"
+    if fp.exists():
+        stats = json.loads(fp.read_text())
+        return stats["mean"], stats["std"]
+
+    def collate_fn(rows):
+        # Reduce each batch to sufficient statistics in the worker
+        xs = tfm([row[feature] for row in rows])
+        x = torch.cat([x.double().flatten(1) for x in xs], 1)
+        return x.sum(1), (x**2).sum(1), x.shape[1]
+
+    ds = ds.select_columns([feature]).with_format(None)
+    dl = DataLoader(
+        DataLoaders.decoding(ds, [feature], decode=pipe is not None),
+        batch_size=bs,
+        collate_fn=collate_fn,
+        num_workers=nworkers,
+    )
+    s = ss = n = 0
+    for s_, ss_, n_ in dl:
+        s, ss, n = s + s_, ss + ss_, n + n_
+    mean = s / n
+    std = ((ss - n * mean**2) / (n - 1)).sqrt()
+    stats = {"mean": mean.tolist(), "std": std.tolist(), "n": n}
+
+    with atomic_write(fp) as tmp:
+        tmp.write_text(json.dumps(stats))
+    return stats["mean"], stats["std"]
+
+
+def tensorize_images(
+    dls, feature="image", normalize=True, pipe=None, size=None, uint8=False
+):
+    """Tensorize and normalize the image feature
+
+    By default, each batch is decoded straight from the Arrow image bytes and
+    converted with `ImageBatch`, optionally resizing to `size`. A per-image
+    `pipe` of torchvision transforms is applied one image at a time instead.
+    `normalize` may be a `(mean, std)` pair, rather than the dataset statistics.
+
+    With `uint8`, batches are left as uint8, which is 4x less to transfer,
+    and the statistics are only stored as `dls.stats` for normalizing on the
+    device, e.g., with `NormalizeBatchCB(stats=dls.stats)`."""
+    if uint8 and pipe is not None:
+        raise ValueError("Per-image `pipe`s produce floats, so pass `uint8=False`")
+    if normalize is True:
+        if dls.streaming:
+            raise ValueError(
+                "Pass `normalize=(mean, std)` for streaming datasets, since the "
+                "statistics would take a full pass over the data"
+            )
+        normalize = image_stats(
+            dls.splits["train"], feature, pipe, size, nworkers=dls.nworkers
+        )
+    dls.stats = normalize or None
+    mean, std = normalize or (None, None)
+    if uint8:
+        tfm = ImageBatch(size, uint8=True)
+    elif pipe is None:
+        tfm = ImageBatch(size, mean, std)
+    else:
+        if normalize:
+            pipe = [*pipe, T.Normalize(mean, std)]
+        tfm = batchify(T.Compose(pipe))
+    # Without a `pipe`, skip creating PIL images only to convert them to tensors
+    return dls.with_transforms({feature: tfm}, lazy=True, decode=pipe is not None)
+
+# %% ../nbs/07_learner.ipynb 32
+class TensorStore:
+    """A split of images and labels, held as contiguous uint8 arrays on disk
+    and memory-mapped, that is served a whole batch at a time"""
+
+    def __init__(self, dir_, mean=None, std=None, tfms=()):
+        self.dir = Path(dir_)
+        self.meta = json.loads((self.dir / "meta.json").read_text())
+        self.feature = self.meta["feature"]
+        self.label = self.meta["label"]
+        self.tfm = ImageBatch(mean=mean, std=std)
+        self.tfms = tfms
+        self.images = self.labels = None
+
+    @staticmethod
+    def write(ds, dir_, feature="image", label="label", size=None, bs=1024):
+        """Decode the images of `ds` into `dir_`, unless they are already there"""
+        dir_ = Path(dir_)
+        if dir_.exists():
+            return
+        with atomic_write(dir_, is_dir=True) as tmp:
+            tfm = ImageBatch(size)
+            images = None
+            ds_images = ds.select_columns([feature]).with_format(None)
+            ds_images = DataLoaders.decoding(ds_images, [feature], decode=False)
+            for i in range(0, len(ds), bs):
+                x = tfm.resize(tfm.decode(ds_images[i : i + bs][feature]))
+                if images is None:
+                    images = np.lib.format.open_memmap(
+                        tmp / "images.npy",
+                        mode="w+",
+                        dtype=np.uint8,
+                        shape=(len(ds), *x.shape[1:]),
+                    )
+                images[i : i + len(x)] = x.numpy()
+            images.flush()
+            del images
+            labels = ds.select_columns([label]).with_format("numpy")[label]
+            np.save(tmp / "labels.npy", np.asarray(labels, dtype=np.int64))
+            meta = dict(feature=feature, label=label, n=len(ds))
+            (tmp / "meta.json").write_text(json.dumps(meta))
+
+    def open(self):
+        if self.images is None:
+            # Copy-on-write, so that slices are writable tensors but the file
+            # is never modified
+            self.images = np.load(self.dir / "images.npy", mmap_mode="c")
+            self.labels = np.load(self.dir / "labels.npy")
+        return self.images, self.labels
+
+    def __getstate__(self):
+        # Workers reopen the memory map, rather than receiving a copy
+        return {**self.__dict__, "images": None, "labels": None}
+
+    def __len__(self):
+        return self.meta["n"]
+
+    @property
+    def features(self):
+        return [self.feature, self.label]
+
+    def __getitems__(self, idxs):
+        images, labels = self.open()
+        idxs = np.asarray(idxs)
+        if len(idxs) and (np.diff(idxs) == 1).all():
+            # Contiguous and in order, so slice the memory map without copying
+            x, y = images[idxs[0] : idxs[-1] + 1], labels[idxs[0] : idxs[-1] + 1]
+        else:
+            x, y = images[idxs], labels[idxs]
+        x = self.tfm.convert(torch.from_numpy(x))
+        for tfm in self.tfms:
+            x = tfm(x)
+        return {self.feature: x, self.label: torch.from_numpy(y)}
+
+    def __getitem__(self, i):
+        return {k: v[0] for k, v in self.__getitems__([i]).items()}
+
+    def unique(self, column):
+        _, labels = self.open()
+        return np.unique(labels).tolist() if column == self.label else []
+
+    def stats(self, bs=4096):
+        """Exact per-channel mean and standard deviation, computed once"""
+        if "mean" not in self.meta:
+            images, _ = self.open()
+            s = ss = 0
+            for i in range(0, len(self), bs):
+                x = torch.from_numpy(images[i : i + bs]).double().div_(255)
+                x = x.transpose(0, 1).flatten(1)
+                s, ss = s + x.sum(1), ss + (x**2).sum(1)
+            n = images[0, 0].size * len(self)
+            mean = s / n
+            std = ((ss - n * mean**2) / (n - 1)).sqrt()
+            self.meta.update(mean=mean.tolist(), std=std.tolist())
+            with atomic_write(self.dir / "meta.json") as tmp:
+                tmp.write_text(json.dumps(self.meta))
+        return self.meta["mean"], self.meta["std"]
+
+
+@fc.patch(cls_method=True)
+def from_tensor_store(
+    cls: DataLoaders,
+    dsd,
+    feature="image",
+    label="label",
+    size=None,
+    normalize=True,
+    tfms=(),
+    dir_=cache_dir / "tensors",
+    **kwargs,
+):
+    """Serve the images of a dataset (or dataset id) from memory-mapped uint8
+    arrays, written once per split. `tfms` augment the training batches"""
+    if isinstance(dsd, str):
+        dsd = load_dataset(dsd)
+    dirs = {}
+    for split, ds in dsd.items():
+        dirs[split] = Path(dir_) / cache_key(ds._fingerprint, feature, label, size)
+        TensorStore.write(ds, dirs[split], feature, label, size)
+    if normalize is True:
+        normalize = TensorStore(dirs["train"]).stats()
+    mean, std = normalize or (None, None)
+    splits = {
+        split: TensorStore(d, mean, std, tfms if split == "train" else ())
+        for split, d in dirs.items()
+    }
+    return cls(splits, collate_fn=fc.noop, **kwargs)
+
+# %% ../nbs/07_learner.ipynb 36
+def batch_size(b):
+    """Number of examples in a (possibly nested) batch"""
+    if isinstance(b, torch.Tensor):
+        return len(b)
+    if isinstance(b, Mapping):
+        b = list(b.values())
+    return batch_size(b[0])
+
+
+def untransformed(ds):
+    """The dataset without its lazy transforms, or `None` if they cannot be
+    separated from reading the data"""
+    if isinstance(ds, datasets.Dataset) and ds.format["type"] == "custom":
+        return ds.with_format(None)
+    if isinstance(ds, TensorStore):
+        return TensorStore(ds.dir)
+    return None
+
+
+def fetch(ds, idxs):
+    if hasattr(ds, "__getitems__"):
+        return ds.__getitems__(idxs)
+    return [ds[i] for i in idxs]
+
+
+def stage_times(ds, collate_fn, batches):
+    """Milliseconds per batch spent decoding, transforming and collating
+
+    Images that are stored encoded, as for `tensorize_images`, are decoded by
+    `ImageBatch` within the transforms, which is counted as decoding."""
+    raw = untransformed(ds)
+    decode = transform = collate = 0.0
+    for idxs in batches:
+        start = time.perf_counter()
+        if raw is not None:
+            fetch(raw, idxs)
+        decoded = time.perf_counter()
+        decode_s = ImageBatch.decode_s
+        examples = fetch(ds, idxs)
+        fetched = time.perf_counter()
+        in_transform = ImageBatch.decode_s - decode_s
+        collate_fn(examples)
+        collated = time.perf_counter()
+        if raw is None:
+            decode += fetched - decoded
+        else:
+            # The transforms are applied on top of reading the data again
+            decode += decoded - start + in_transform
+            transform += max(fetched - decoded - (decoded - start) - in_transform, 0.0)
+        collate += collated - fetched
+    n = max(len(batches), 1)
+    return dict(
+        decode_ms=1e3 * decode / n,
+        transform_ms=1e3 * transform / n if raw is not None else None,
+        collate_ms=1e3 * collate / n,
+    )
+
+
+def stream_stage_times(ds, collate_fn, bs, n_batches):
+    """Like `stage_times`, but the mapped transforms of a stream are applied
+    as it is read, so they are included in the decoding time"""
+    it = iter(ds)
+    decode = collate = 0.0
+    n = 0
+    for _ in range(n_batches):
+        start = time.perf_counter()
+        examples = list(itertools.islice(it, bs))
+        fetched = time.perf_counter()
+        if not examples:
+            break
+        collate_fn(examples)
+        decode += fetched - start
+        collate += time.perf_counter() - fetched
+        n += 1
+    n = max(n, 1)
+    return dict(
+        decode_ms=1e3 * decode / n, transform_ms=None, collate_ms=1e3 * collate / n
+    )
+
+
+def loader_throughput(dl, n_batches):
+    """Time to the first batch and samples per second thereafter"""
+    start = time.perf_counter()
+    it = iter(dl)
+    n = n_samples = 0
+    first = None
+    for batch in it:
+        if first is None:
+            first = time.perf_counter()
+        else:
+            n += 1
+            n_samples += batch_size(batch)
+            if n == n_batches:
+                break
+    end = time.perf_counter()
+    del it  # Shut the workers down
+    if first is None:
+        return dict(first_batch_s=None, batches_per_s=0.0, samples_per_s=0.0)
+    elapsed = max(end - first, 1e-9)
+    return dict(
+        first_batch_s=first - start,
+        batches_per_s=n / elapsed,
+        samples_per_s=n_samples / elapsed,
+    )
+
+
+@fc.patch
+def benchmark(
+    self: DataLoaders,
+    split="train",
+    n_batches=50,
+    nworkers=None,
+    bss=None,
+    tolerance=0.05,
+):
+    """Profile the data pipeline of a split and sweep the number of workers
+    (`nworkers`) and batch sizes (`bss`) for the best throughput"""
+    ds = self.splits[split]
+    if nworkers is None:
+        ncpu = multiprocessing.cpu_count()
+        nworkers = [0, *(2**i for i in range(ncpu.bit_length()) if 2**i <= ncpu)]
+    bss = fc.L(bss or [self.bs])
+    nworkers = fc.L(nworkers)
+
+    # Stage times are measured in this process, with the default batch size
+    if isinstance(ds, datasets.IterableDataset):
+        stages = stream_stage_times(ds, self.collate_fn, self.bs, n_batches)
     else:
-        return dls.with_transforms({feature: batchify(T.Compose(pipe))}, lazy=True)
+        sampler = EpochBatchSampler(len(ds), self.bs, shuffle=False)
+        batches = list(itertools.islice(sampler, n_batches))
+        stages = stage_times(ds, self.collate_fn, batches)
+    work_ms = sum(v for v in stages.values() if v is not None)
+    stages["bottleneck"] = max(
+        (k for k, v in stages.items() if v is not None), key=stages.get
+    )
+
+    sweep = []
+    for bs in bss:
+        s = copy(self)
+        s.loaders = {}
+        s.bs = bs
+        s.persistent_workers = False
+        for nw in nworkers:
+            r = dict(
+                nworkers=nw, bs=bs, **loader_throughput(s.dl(split, nw), n_batches)
+            )
+            # The fraction of the workers' time spent producing batches,
+            # estimated from the single process stage times
+            busy_s = r["batches_per_s"] * work_ms * bs / self.bs / 1e3
+            r["worker_utilisation"] = min(busy_s / nw, 1.0) if nw else None
+            sweep.append(r)
+
+    best = max(r["samples_per_s"] for r in sweep)
+    good = [r for r in sweep if r["samples_per_s"] >= (1 - tolerance) * best]
+    rec = min(good, key=lambda r: (r["nworkers"], -r["bs"]))
+    return dict(
+        split=split,
+        stages=stages,
+        sweep=sweep,
+        recommended=dict(nworkers=rec["nworkers"], bs=rec["bs"]),
+    )
 
-# %% ../nbs/07_learner.ipynb 20
+# %% ../nbs/07_learner.ipynb 42
 class CancelFitException(Exception):
     """Exit fit context"""
 
@@ -181,7 +927,7 @@ class CancelBatchException(Exception):
 class CancelEpochException(Exception):
     """Skip to the next epoch"""
 
-# %% ../nbs/07_learner.ipynb 22
+# %% ../nbs/07_learner.ipynb 44
 class Callback:
     """Modify the training behavior"""
 
@@ -189,34 +935,72 @@ class Callback:
         cls.order = order
         super().__init_subclass__()
 
-# %% ../nbs/07_learner.ipynb 23
+# %% ../nbs/07_learner.ipynb 45
 class with_cbs:
     """Run the callbacks lifecycle at the apropriate time"""
 
     def __init__(self, nm):
         self.nm = nm
+        # Resolve the hook names up front, rather than on every call
+        self.before_nm = f"before_{nm}"
+        self.after_nm = f"after_{nm}"
+        self.cleanup_nm = f"cleanup_{nm}"
 
     def __call__(self, f):
+        cancel_exc = globals()[f"Cancel{self.nm.title()}Exception"]
+
         def _f(o, *args, **kwargs):
             try:
-                o.callback(f"before_{self.nm}")
+                o.callback(self.before_nm)
                 f(o, *args, **kwargs)
-                o.callback(f"after_{self.nm}")
-            except globals()[f"Cancel{self.nm.title()}Exception"]:
+                o.callback(self.after_nm)
+            except cancel_exc:
                 pass
             finally:
-                o.callback(f"cleanup_{self.nm}")
+                o.callback(self.cleanup_nm)
 
         return _f
 
-# %% ../nbs/07_learner.ipynb 24
+# %% ../nbs/07_learner.ipynb 46
 def only(f):
     """If the lifecycle hook is decorated as such, only run this
     hook and not other callbacks' hooks"""
     f.only = True
     return f
 
-# %% ../nbs/07_learner.ipynb 25
+# %% ../nbs/07_learner.ipynb 47
+def split_batch(b, sz):
+    """Split a (possibly nested) batch into micro-batches of at most `sz` examples"""
+    if isinstance(b, torch.Tensor):
+        return b.split(sz)
+    if isinstance(b, Mapping):
+        return [dict(zip(b, o)) for o in zip(*(split_batch(v, sz) for v in b.values()))]
+    return [type(b)(o) for o in zip(*(split_batch(v, sz) for v in b))]
+
+
+def cat_batch(bs):
+    """Concatenate micro-batches, the inverse of `split_batch`"""
+    b = bs[0]
+    if isinstance(b, torch.Tensor):
+        return torch.cat(bs)
+    if isinstance(b, Mapping):
+        return {k: cat_batch([o[k] for o in bs]) for k in b}
+    return type(b)(cat_batch(list(o)) for o in zip(*bs))
+
+
+def mark_last(it):
+    """Pair each item with whether it is the last, looking one item ahead"""
+    it = iter(it)
+    try:
+        prev = next(it)
+    except StopIteration:
+        return
+    for o in it:
+        yield prev, False
+        prev = o
+    yield prev, True
+
+# %% ../nbs/07_learner.ipynb 48
 class Learner:
     """Flexible training loop"""
 
@@ -228,46 +1012,135 @@ class Learner:
         lr=0.1,
         cbs=None,
         opt_func=optim.SGD,
+        accumulate=1,
+        micro_bs=None,
     ):
         cbs = fc.L(cbs)
         fc.store_attr()
+        self.reset_dispatch()
 
-    def run_cbs(self, method_nm):
+    def reset_dispatch(self):
+        """Invalidate the dispatch tables, e.g., after adding or removing callbacks"""
+        self.dispatch = {}
+
+    def dispatch_table(self, method_nm):
+        """Bound hooks to run for a lifecycle event, in order"""
         for cb in self.cbs:
             method = getattr(cb, method_nm, None)
             if method is not None:
                 if getattr(method, "only", False):
-                    method(self)
-                    return
+                    return [method]
+        methods = []
         for cb in sorted(self.cbs, key=lambda cb: cb.order):
             method = getattr(cb, method_nm, None)
             if method is not None:
-                method(self)
+                methods.append(method)
+        return methods
 
-    @with_cbs("batch")
-    def _one_batch(self):
+    def run_cbs(self, method_nm):
+        try:
+            methods = self.dispatch[method_nm]
+        except KeyError:
+            methods = self.dispatch[method_nm] = self.dispatch_table(method_nm)
+        for method in methods:
+            method(self)
+
+    def _one_micro_batch(self, weight):
         self.predict()
         self.callback("after_predict")
         self.get_loss()
         self.callback("after_loss")
         if self.training:
+            loss = self.loss
+            if weight != 1:
+                # Scale the gradients, but report the unscaled loss
+                self.loss = loss * weight
             self.backward()
+            self.loss = loss
             self.callback("after_backward")
+
+    def _accumulation(self):
+        """Weight of this batch's gradients, and whether to step the optimizer
+
+        Each batch is weighted by its share of the group's examples, as if the
+        group were a single batch. Until the group ends, we assume its batches
+        are as large as the first, and correct the gradients when stepping if
+        they were not, e.g., for a short last batch."""
+        self.grad_scale = 1
+        if self.accumulate == 1:
+            return 1, self.training
+        bs = batch_size(self.batch)
+        start = self.iter - self.iter % self.accumulate
+        n = self.accumulate
+        if self.n_iter is not None:
+            # The last group of the epoch may have fewer batches
+            n = min(n, self.n_iter - start)
+        if self.iter == start:
+            self.group_size, self.n_seen = n * bs, 0
+        self.n_seen += bs
+        # Without a length, we only learn that the last group is short once we
+        # reach its last batch
+        stepped = self.iter + 1 == start + n or self.is_last
+        if stepped and self.n_seen != self.group_size:
+            self.grad_scale = self.group_size / self.n_seen
+        return bs / self.group_size, self.training and stepped
+
+    def _micro_batches(self, weight):
+        batch, preds, loss = self.batch, [], 0
+        n = batch_size(batch)
+        for self.batch in split_batch(batch, self.micro_bs):
+            frac = batch_size(self.batch) / n
+            self._one_micro_batch(weight * frac)
+            # Keeping the graph of every micro-batch would defeat the purpose
+            p = self.preds
+            preds.append(p.detach() if isinstance(p, torch.Tensor) else p)
+            loss = loss + self.loss.detach() * frac
+        self.batch, self.preds, self.loss = batch, cat_batch(preds), loss
+
+    @with_cbs("batch")
+    def _one_batch(self):
+        weight, self.stepped = self._accumulation()
+        if self.micro_bs is None or batch_size(self.batch) <= self.micro_bs:
+            self._one_micro_batch(weight)
+        else:
+            self._micro_batches(weight)
+        if self.stepped:
+            if self.grad_scale != 1:
+                for p in self.model.parameters():
+                    if p.grad is not None:
+                        p.grad.mul_(self.grad_scale)
             self.step()
             self.callback("after_step")
             self.zero_grad()
 
     @with_cbs("epoch")
     def _one_epoch(self):
-        for self.iter, self.batch in enumerate(self.dl):
+        self.is_last = False
+        if self.n_iter is not None:
+            for self.iter, self.batch in enumerate(self.dl, self.start_iter):
+                self._one_batch()
+            return
+        # Look one batch ahead, so that a short last group knows it is the last
+        batches = mark_last(self.dl)
+        for self.iter, (self.batch, self.is_last) in enumerate(
+            batches, self.start_iter
+        ):
             self._one_batch()
 
     def one_epoch(self, training):
         self.model.train(training)
-        # Note that __getattr__ is lru_cache'd
-        # TODO: test whether this actually makes things faster
+        # Note that the loaders, and their workers, are reused across epochs
         self.dl = self.dls["train" if training else "test"]
+        try:
+            self.n_iter = len(self.dl)
+        except TypeError:
+            # e.g., a streaming dataset
+            self.n_iter = None
+        if self.start_iter:
+            # Resuming mid-epoch, so skip the batches we have already seen
+            self.dl = skip_batches(self.dl, self.start_iter)
         self._one_epoch()
+        self.start_iter = 0
 
     @with_cbs("fit")
     def _fit(self, train, valid):
@@ -278,23 +1151,24 @@ class Learner:
                 torch.no_grad()(self.one_epoch)(False)
 
     def fit(self, n_epochs=1, train=True, valid=True, cbs=None, lr=None):
-        with tempfile.TemporaryDirectory() as tdir:
-            self.dls.tdir = tdir
-            cbs = fc.L(cbs)
-            # `add_cb` and `rm_cb` were added in lesson 18
+        cbs = fc.L(cbs)
+        # `add_cb` and `rm_cb` were added in lesson 18
+        for cb in cbs:
+            self.cbs.append(cb)
+        self.reset_dispatch()
+        try:
+            self.n_epochs = n_epochs
+            self.epochs = range(n_epochs)
+            self.start_iter = 0
+            if lr is None:
+                lr = self.lr
+            if self.opt_func:
+                self.opt = self.opt_func(self.model.parameters(), lr)
+            self._fit(train, valid)
+        finally:
             for cb in cbs:
-                self.cbs.append(cb)
-            try:
-                self.n_epochs = n_epochs
-                self.epochs = range(n_epochs)
-                if lr is None:
-                    lr = self.lr
-                if self.opt_func:
-                    self.opt = self.opt_func(self.model.parameters(), lr)
-                self._fit(train, valid)
-            finally:
-                for cb in cbs:
-                    self.cbs.remove(cb)
+                self.cbs.remove(cb)
+            self.reset_dispatch()
 
     def __getattr__(self, name):
         if name in ("predict", "get_loss", "backward", "step", "zero_grad"):
@@ -308,7 +1182,7 @@ class Learner:
     def training(self):
         return self.model.training
 
-# %% ../nbs/07_learner.ipynb 27
+# %% ../nbs/07_learner.ipynb 50
 class TrainCB(Callback):
     """Training specific behaviors for the `Learner`"""
 
@@ -329,16 +1203,27 @@ class TrainCB(Callback):
     def zero_grad(self, learn):
         learn.opt.zero_grad()
 
-# %% ../nbs/07_learner.ipynb 29
+# %% ../nbs/07_learner.ipynb 52
 class MetricsCB(Callback):
-    """Update and print metrics"""
+    """Update and print metrics
 
-    def __init__(self, *ms, **metrics):
+    With `on_device=True`, the metrics accumulate on the training device and
+    are only transfered to the host at the end of the epoch. Pass metrics
+    with `validate_args=False` to avoid synchronizing on every batch."""
+
+    def __init__(self, *ms, on_device=False, **metrics):
         for o in ms:
             metrics[type(o).__name__] = o
         self.metrics = metrics
+        self.on_device = on_device
+        self.device = None
         self.all_metrics = copy(metrics)
-        self.all_metrics["loss"] = self.loss = torchmetrics.aggregation.MeanMetric()
+        if on_device:
+            # Checking for NaNs would synchronize with the device on every batch
+            loss = torchmetrics.aggregation.MeanMetric(nan_strategy="disable")
+        else:
+            loss = torchmetrics.aggregation.MeanMetric()
+        self.all_metrics["loss"] = self.loss = loss
 
     def _log(self, d, learn):
         print(d)
@@ -350,18 +1235,36 @@ class MetricsCB(Callback):
         [o.reset() for o in self.all_metrics.values()]
 
     def after_epoch(self, learn):
-        log = {k: f"{v.compute():.3f}" for k, v in self.all_metrics.items()}
+        # Stack the results to transfer them to the host all at once
+        values = torch.stack([v.compute().float() for v in self.all_metrics.values()])
+        log = {k: f"{v:.3f}" for k, v in zip(self.all_metrics, values.tolist())}
         log["epoch"] = learn.epoch
         log["train"] = "train" if learn.model.training else "eval"
         self._log(log, learn)
 
     def after_batch(self, learn):
-        x, y = to_cpu(learn.batch)
+        if self.on_device:
+            self._update_on_device(learn)
+        else:
+            x, y = to_cpu(learn.batch)
+            for m in self.metrics.values():
+                m.update(learn.preds.cpu(), y)
+            self.loss.update(learn.loss.cpu(), weight=batch_size(x))
+
+    def _update_on_device(self, learn):
+        x, y = learn.batch
+        preds = learn.preds.detach()
+        if self.device != preds.device:
+            self.device = preds.device
+            for m in self.all_metrics.values():
+                m.to(self.device)
         for m in self.metrics.values():
-            m.update(learn.preds.cpu(), y)
-        self.loss.update(learn.loss.cpu(), weight=len(x))
+            m.update(preds, y)
+        # Without NaN checking, `MeanMetric` ignores the weights, so
+        # repeat the loss for each example instead
+        self.loss.update(learn.loss.detach().expand(batch_size(x)))
 
-# %% ../nbs/07_learner.ipynb 33
+# %% ../nbs/07_learner.ipynb 56
 class DeviceCB(Callback):
     """Move tensors and model to the CPU/GPU/etc"""
 
@@ -393,12 +1296,16 @@ def before(callback_cls: Union[Sequence[Type[Callback]], Type[Callback]]):
 
 
 class ProgressCB(Callback, order=after(MetricsCB)):
-    """Report the progress"""
+    """Report the progress
+
+    Losses are buffered on the device and only reported every `periodicity`
+    batches or every `interval` seconds, whichever comes first, so that the
+    training loop does not need to wait on the device for every batch."""
 
-    def __init__(self, plot=False, periodicity=10):
+    def __init__(self, plot=False, periodicity=10, interval=1.0):
         self.plot = plot
         self.periodicity = periodicity
-        self.i = 0
+        self.interval = interval
 
     def before_fit(self, learn):
         learn.epochs = self.mbar = master_bar(learn.epochs)
@@ -406,42 +1313,67 @@ class ProgressCB(Callback, order=after(MetricsCB)):
         if hasattr(learn, "metrics"):
             learn.metrics._log = self._log
         self.losses = []
+        self.loss_steps = []
         self.val_losses = []
+        self.val_steps = []
+        self.buffer = None
 
     def _log(self, d, learn):
         if self.first:
             self.mbar.write(list(d), table=True)
             self.first = False
-        self.mbar.write(list(d.values()), table=True)
+        self.mbar.write([str(v) for v in d.values()], table=True)
 
     def before_epoch(self, learn):
-        learn.dl = progress_bar(learn.dl, leave=False, parent=self.mbar)
+        total = None if learn.n_iter is not None else "noinfer"
+        learn.dl = progress_bar(learn.dl, total, leave=False, parent=self.mbar)
+        self.n_buffered = 0
+        self.last_flush = time.monotonic()
 
     def after_batch(self, learn):
-        learn.dl.comment = f"{learn.loss:.3f}"
+        loss, device = learn.loss, torch.device("cpu")
+        if isinstance(loss, torch.Tensor):
+            loss, device = loss.detach(), loss.device
+        if self.buffer is None or self.buffer.device != device:
+            self.buffer = torch.empty(self.periodicity, device=device)
+        self.buffer[self.n_buffered] = loss
+        self.n_buffered += 1
+        if (
+            self.n_buffered == self.periodicity
+            or time.monotonic() - self.last_flush > self.interval
+        ):
+            self._flush(learn)
+
+    def _flush(self, learn):
+        if self.n_buffered == 0:
+            return
+        # A single transfer to the host for all the buffered losses
+        losses = self.buffer[: self.n_buffered].tolist()
+        self.n_buffered = 0
+        self.last_flush = time.monotonic()
+        learn.dl.comment = f"{losses[-1]:.3f}"
         if self.plot and hasattr(learn, "metrics") and learn.training:
-            self.losses.append(learn.loss.item())
-            if self.val_losses and self.i % self.periodicity == 0:
-                x = [fc.L.range(self.losses), self.losses]
-                steps = fc.L.range(learn.epoch).map(
-                    lambda x: (x + 1) * len(learn.dls["train"])
-                )
-                y = [steps, self.val_losses]
-                self.mbar.update_graph([x, y])
-        self.i += 1
+            n = len(self.losses)
+            self.losses.extend(losses)
+            self.loss_steps.extend(range(n, n + len(losses)))
+            self._update_graph()
+
+    def _update_graph(self):
+        self.mbar.update_graph(
+            [[self.loss_steps, self.losses], [self.val_steps, self.val_losses]]
+        )
 
     def after_epoch(self, learn):
+        self._flush(learn)
         if not learn.training:
             if self.plot and hasattr(learn, "metrics"):
-                self.val_losses.append(learn.metrics.all_metrics["loss"].compute())
-                x = [fc.L.range(self.losses), self.losses]
-                steps = fc.L.range(learn.epoch + 1).map(
-                    lambda x: (x + 1) * len(learn.dls["train"])
+                self.val_losses.append(
+                    learn.metrics.all_metrics["loss"].compute().item()
                 )
-                y = [steps, self.val_losses]
-                self.mbar.update_graph([x, y])
+                self.val_steps.append(len(self.losses))
+                self._update_graph()
 
-# %% ../nbs/07_learner.ipynb 34
+# %% ../nbs/07_learner.ipynb 57
 def to_cpu(x):
     if isinstance(x, Mapping):
         return {k: to_cpu(v) for k, v in x.items()}
@@ -452,14 +1384,14 @@ def to_cpu(x):
     res = x.detach().cpu()
     return res.float() if res.dtype == torch.float16 else res
 
-# %% ../nbs/07_learner.ipynb 35
+# %% ../nbs/07_learner.ipynb 58
 def fashion_mnist(bs=2048, **kwargs):
     """Helper to use fashion MNIST"""
     return tensorize_images(
         DataLoaders.from_hf("fashion_mnist", bs=bs, nworkers=4), **kwargs
     ).listify()
 
-# %% ../nbs/07_learner.ipynb 42
+# %% ../nbs/07_learner.ipynb 65
 class TrainLearner(Learner):
     """Sane training loop"""
 
@@ -480,7 +1412,7 @@ class TrainLearner(Learner):
     def zero_grad(self):
         self.opt.zero_grad()
 
-# %% ../nbs/07_learner.ipynb 46
+# %% ../nbs/07_learner.ipynb 78
 class MomentumCB(Callback):
     def __init__(self, momentum=0.85):
         self.momentum = momentum
@@ -490,7 +1422,7 @@ class MomentumCB(Callback):
             for p in learn.model.parameters():
                 p.grad *= self.momentum
 
-# %% ../nbs/07_learner.ipynb 49
+# %% ../nbs/07_learner.ipynb 81
 class LRFinderCB(Callback):
     """Find an apopriate learning rate by increasing it by a constant factor for each batch
     until the loss diverges"""
@@ -529,3 +1461,361 @@ class LRFinderCB(Callback):
 def lr_find(self: Learner, gamma=1.3, max_mult=3, start_lr=1e-5, max_epochs=10):
     self.fit(max_epochs, lr=start_lr, cbs=LRFinderCB(gamma=gamma, max_mult=max_mult))
     return self
+
+# %% ../nbs/07_learner.ipynb 83
+@fc.patch
+def lr_find_parallel(self: Learner, lrs=None, n_batches=20, tfm=None, plot=True):
+    """Train a copy of the model for each of `lrs` simultaneously, with plain
+    SGD, and return the average loss of each over the last fifth of the run
+
+    `tfm` is applied to each batch once it is on the device, e.g., to normalize it."""
+    device = next(p.device for p in self.model.parameters())
+    device = next((cb.device for cb in self.cbs if isinstance(cb, DeviceCB)), device)
+    if lrs is None:
+        lrs = torch.logspace(-5, 1, 13)
+    lrs = torch.as_tensor(lrs, dtype=torch.float32, device=device)
+    model = self.model.train()
+    params, buffers = torch.func.stack_module_state([model] * len(lrs))
+    params = {k: v.detach().to(device) for k, v in params.items()}
+    buffers = {k: v.to(device) for k, v in buffers.items()}
+    base = deepcopy(model).to("meta")
+
+    def get_loss(params, buffers, xb, yb):
+        preds = torch.func.functional_call(base, (params, buffers), (xb,))
+        return self.loss_func(preds, yb)
+
+    step = torch.func.vmap(
+        torch.func.grad_and_value(get_loss), in_dims=(0, 0, None, None)
+    )
+    losses = torch.empty(n_batches, len(lrs), device=device)
+    batches = itertools.chain.from_iterable(itertools.repeat(self.dls["train"]))
+    for i, batch in zip(range(n_batches), batches):
+        batch = to_device(batch, device)
+        if tfm is not None:
+            batch = tfm(batch)
+        xb, yb = batch
+        grads, losses[i] = step(params, buffers, xb, yb)
+        with torch.no_grad():
+            for k, g in grads.items():
+                params[k].sub_(g * lrs.view(-1, *[1] * (g.ndim - 1)))
+    losses = losses[-max(n_batches // 5, 1) :].mean(0).cpu()
+    lrs = lrs.cpu()
+    if plot:
+        fig, ax = plt.subplots()
+        ax.plot(lrs, losses)
+        ax.set_xscale("log")
+    return dict(
+        lrs=lrs, losses=losses, lr=lrs[losses.nan_to_num(math.inf).argmin()].item()
+    )
+
+# %% ../nbs/07_learner.ipynb 88
+class ProfileCB(Callback, order=before(DeviceCB)):
+    """Time each phase of the training loop and each callback hook to tell
+    whether training is input-bound, compute-bound or callback-bound"""
+
+    phases = ("predict", "get_loss", "backward", "step", "zero_grad")
+
+    def __init__(
+        self,
+        trace_path=None,  # Where to write a Chrome trace of the phases, if anywhere
+        profile_batches=None,  # (start, stop) batches to run under `torch.profiler`
+        profiler_trace_path="torch_trace.json",
+        sync=True,  # Wait for the device before each measurement
+        max_events=100_000,
+        verbose=True,
+    ):
+        fc.store_attr()
+        self.stats = []
+
+    def _now(self):
+        if self.sync and torch.cuda.is_available():
+            torch.cuda.synchronize()
+        return time.perf_counter()
+
+    def _record(self, nm, cat, start, end):
+        self.times[nm] += end - start
+        self.cats[nm] = cat
+        self.last_end = end
+        if self.trace_path and len(self.events) < self.max_events:
+            self.events.append(
+                {
+                    "name": nm,
+                    "cat": cat,
+                    "ph": "X",
+                    "ts": (start - self.t0) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": 0,
+                }
+            )
+
+    def _timed(self, nm, f, cat):
+        def _f(*args, **kwargs):
+            start = self._now()
+            try:
+                if self.prof is None:
+                    return f(*args, **kwargs)
+                with torch.profiler.record_function(nm):
+                    return f(*args, **kwargs)
+            finally:
+                self._record(nm, cat, start, self._now())
+
+        return _f
+
+    def _timed_dispatch_table(self, dispatch_table):
+        def _f(method_nm):
+            methods = []
+            for method in dispatch_table(method_nm):
+                cb = getattr(method, "__self__", None)
+                if cb is not self:
+                    nm = f"{type(cb).__name__}.{method_nm}"
+                    cat = "phase" if method_nm in self.phases else "callback"
+                    method = self._timed(nm, method, cat)
+                methods.append(method)
+            return methods
+
+        return _f
+
+    def before_fit(self, learn):
+        self.t0 = self.last_end = self._now()
+        self.events = []
+        self.stats = []
+        self.n_batch = 0
+        self.prof = None
+        for nm in self.phases:
+            setattr(learn, nm, self._timed(nm, getattr(learn, nm), "phase"))
+        learn.dispatch_table = self._timed_dispatch_table(learn.dispatch_table)
+        learn.reset_dispatch()
+
+    def before_epoch(self, learn):
+        self.times = defaultdict(float)
+        self.cats = {}
+        self.n_batches = 0
+        self.epoch_start = self.last_end = self._now()
+
+    def before_batch(self, learn):
+        self._record("data", "data", self.last_end, self._now())
+        if self.profile_batches and self.n_batch == self.profile_batches[0]:
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            self.prof = torch.profiler.profile(activities=activities)
+            self.prof.__enter__()
+
+    def cleanup_batch(self, learn):
+        self.n_batch += 1
+        self.n_batches += 1
+        if self.prof is not None and self.n_batch >= self.profile_batches[1]:
+            self._stop_profiler()
+        self.last_end = self._now()
+
+    def _stop_profiler(self):
+        self.prof.__exit__(None, None, None)
+        self.prof.export_chrome_trace(str(self.profiler_trace_path))
+        self.prof = None
+
+    def after_epoch(self, learn):
+        stats = {
+            "epoch": learn.epoch,
+            "training": learn.training,
+            "batches": self.n_batches,
+            "wall": self._now() - self.epoch_start,
+            "times": dict(self.times),
+            "bound": self.bound(),
+        }
+        self.stats.append(stats)
+        if self.verbose:
+            print(self.table(stats))
+
+    def bound(self):
+        """Whether the input, compute or callbacks took the most time"""
+        totals = {
+            "input": self.times.get("data", 0.0),
+            "compute": sum(self.times.get(nm, 0.0) for nm in self.phases),
+            "callback": sum(
+                t for nm, t in self.times.items() if self.cats[nm] == "callback"
+            ),
+        }
+        return max(totals, key=totals.get)
+
+    @staticmethod
+    def table(stats):
+        """Plain text table of the time spent in each phase and hook"""
+        mode = "train" if stats["training"] else "eval"
+        n = max(stats["batches"], 1)
+        lines = [
+            f"Epoch {stats['epoch']} ({mode}): {stats['wall']:.2f}s, "
+            f"{stats['bound']}-bound",
+            f"{'':<28}{'total (s)':>10}{'ms/batch':>10}{'%':>7}",
+        ]
+        times = sorted(stats["times"].items(), key=lambda kv: -kv[1])
+        for nm, t in times:
+            pct = 100 * t / stats["wall"]
+            lines.append(f"{nm:<28}{t:>10.3f}{1e3 * t / n:>10.2f}{pct:>7.1f}")
+        return "\n".join(lines)
+
+    def cleanup_fit(self, learn):
+        if self.prof is not None:
+            self._stop_profiler()
+        for nm in self.phases:
+            learn.__dict__.pop(nm, None)
+        learn.__dict__.pop("dispatch_table", None)
+        learn.reset_dispatch()
+        if self.trace_path:
+            with open(self.trace_path, "w") as f:
+                json.dump({"traceEvents": self.events}, f)
+
+# %% ../nbs/07_learner.ipynb 91
+def snapshot(x):
+    """Copy a (possibly nested) state to the host, detached from training"""
+    if isinstance(x, torch.Tensor):
+        return x.detach().to("cpu", copy=True)
+    if isinstance(x, Mapping):
+        return {k: snapshot(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return type(x)(snapshot(o) for o in x)
+    return deepcopy(x)
+
+
+def rng_state(generator=None):
+    """The state of every random number generator, including the loader's
+    `generator`, if any"""
+    state = dict(
+        torch=torch.get_rng_state(),
+        random=random.getstate(),
+        numpy=np.random.get_state(),
+    )
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    if generator is not None:
+        state["loader"] = generator.get_state()
+    return state
+
+
+def set_rng_state(state, generator=None):
+    """Restore the state of every random number generator"""
+    torch.set_rng_state(state["torch"])
+    random.setstate(state["random"])
+    np.random.set_state(state["numpy"])
+    if "cuda" in state:
+        torch.cuda.set_rng_state_all(state["cuda"])
+    if generator is not None and "loader" in state:
+        generator.set_state(state["loader"])
+
+
+class CheckpointCB(Callback, order=before(MetricsCB)):
+    """Snapshot the training state every `every` optimizer steps and at the
+    start of every epoch, writing it to `path` in the background"""
+
+    def __init__(self, path="checkpoint.pt", every=None, resume=False):
+        fc.store_attr()
+        self.path = Path(path)
+        self.executor = None
+        self.pending = None
+
+    def stateful(self, learn):
+        """The callbacks, e.g., the schedulers, that carry training state of their
+        own through `state_dict` and `load_state_dict`"""
+        return [cb for cb in learn.cbs if callable(getattr(cb, "state_dict", None))]
+
+    def sampler(self, learn):
+        """Whatever keeps track of the data order across epochs, if anything"""
+        dl = learn.dls["train"]
+        for o in (dl, getattr(dl, "batch_sampler", None)):
+            if isinstance(o, (EpochBatchSampler, StreamingDataLoader)):
+                return o
+
+    def generator(self, learn):
+        """The loader's own RNG, which seeds its workers, if it has one"""
+        return getattr(learn.dls["train"], "generator", None)
+
+    def before_fit(self, learn):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.n_steps = 0
+        self.due = False
+        self.state = None
+        if self.resume and self.path.exists():
+            self.state = torch.load(self.path, weights_only=False)
+            learn.model.load_state_dict(self.state["model"])
+            self.n_steps = self.state["n_steps"]
+            learn.epochs = range(self.state["epoch"], learn.n_epochs)
+            learn.start_iter = self.state["iter"]
+            sampler = self.sampler(learn)
+            if sampler is not None and self.state["sampler_epoch"] is not None:
+                sampler.set_epoch(self.state["sampler_epoch"])
+        self.first_epoch = learn.epochs[0] if len(learn.epochs) else None
+
+    def before_epoch(self, learn):
+        if not learn.training:
+            return
+        if self.state is not None:
+            # Creating the schedulers in `before_fit` resets the learning rate,
+            # so restore the optimizer and callbacks once they all exist
+            learn.opt.load_state_dict(self.state["opt"])
+            for cb, sd in zip(self.stateful(learn), self.state["cbs"]):
+                cb.load_state_dict(sd)
+            # Replay the data order of the epoch, if the loader shuffles with
+            # the global RNG rather than an `EpochBatchSampler`
+            set_rng_state(self.state["epoch_rng"], self.generator(learn))
+            if self.state["rng"] is None:
+                self.state = None
+        elif learn.epoch != self.first_epoch:
+            self.save(learn, learn.epoch, 0, rng_state(self.generator(learn)))
+        self.epoch_rng = rng_state(self.generator(learn))
+        self.due = False
+
+    def before_batch(self, learn):
+        if not learn.training:
+            return
+        if self.state is not None:
+            set_rng_state(self.state["rng"], self.generator(learn))
+            self.state = None
+        elif self.due:
+            # Snapshot here, rather than in `after_batch`, so that every
+            # callback, e.g., the schedulers, has finished with the last batch
+            rng = rng_state(self.generator(learn))
+            self.save(learn, learn.epoch, learn.iter, self.epoch_rng, rng)
+        self.due = False
+
+    def after_batch(self, learn):
+        if learn.training and learn.stepped:
+            self.n_steps += 1
+            self.due = self.every is not None and self.n_steps % self.every == 0
+
+    def after_fit(self, learn):
+        self.save(learn, learn.n_epochs, 0, rng_state(self.generator(learn)))
+
+    def cleanup_fit(self, learn):
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown()
+
+    def save(self, learn, epoch, iter, epoch_rng, rng=None):
+        sampler = self.sampler(learn)
+        state = dict(
+            model=learn.model.state_dict(),
+            opt=learn.opt.state_dict(),
+            cbs=[cb.state_dict() for cb in self.stateful(learn)],
+            n_steps=self.n_steps,
+            epoch=epoch,
+            iter=iter,
+            epoch_rng=epoch_rng,
+            rng=rng,
+            # Mid-epoch, the sampler has already moved on to the next epoch
+            sampler_epoch=None if sampler is None else sampler.epoch - (iter > 0),
+        )
+        # Copy the tensors now, so that training can carry on while we write
+        state = snapshot(state)
+        # Bound the memory to one snapshot in flight
+        self.wait()
+        self.pending = self.executor.submit(self.write, state)
+
+    def wait(self):
+        if self.pending is not None:
+            self.pending.result()
+            self.pending = None
+
+    def write(self, state):
+        with atomic_write(self.path) as tmp:
+            torch.save(state, tmp)
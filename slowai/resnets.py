@@ -173,7 +173,9 @@ class SummaryCB(HooksCallback):
         raise CancelFitException
 
 # %% ../nbs/11_resnets.ipynb 20
-def summarize(m, mods, dls=fashion_mnist(512)):
+def summarize(m, mods, dls=None):
+    if dls is None:
+        dls = fashion_mnist(512)
     TrainLearner(
         m,
         dls,
@@ -1,9 +1,13 @@
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/10_stable_sgd.ipynb.
 
 # %% auto 0
-__all__ = ['train', 'BaseSchedulerCB', 'BatchSchedulerCB', 'RecorderCB', 'train_1cycle']
+__all__ = ['train', 'BaseSchedulerCB', 'BatchSchedulerCB', 'compile_spec', 'RecorderCB', 'cos_anneal', 'one_cycle', 'cosine',
+           'ScheduleCB', 'train_1cycle']
 
 # %% ../nbs/10_stable_sgd.ipynb 3
+import numbers
+import operator
+from collections.abc import Mapping, Sequence
 from functools import partial
 
 import fastcore.all as fc
@@ -11,6 +15,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import torch
 import torch.nn.functional as F
+from glom import glom
 from torch.optim import lr_scheduler
 from torchmetrics.classification import MulticlassAccuracy
 
@@ -33,7 +38,9 @@ from slowai.learner import (
 from .utils import glomf as g
 
 # %% ../nbs/10_stable_sgd.ipynb 5
-def train(model, lr, n_epochs=3, bs=512, opt_func=torch.optim.SGD, cbs=tuple()):
+def train(
+    model, lr, n_epochs=3, bs=512, opt_func=torch.optim.SGD, cbs=tuple(), dls=None
+):
     """Train a Fashion MNIST model"""
     cbs_ = [
         MetricsCB(MulticlassAccuracy(num_classes=10)),
@@ -44,7 +51,7 @@ def train(model, lr, n_epochs=3, bs=512, opt_func=torch.optim.SGD, cbs=tuple()):
         cbs_.extend(cbs)
     TrainLearner(
         model,
-        fashion_mnist(bs),
+        fashion_mnist(bs) if dls is None else dls,
         F.cross_entropy,
         lr=lr,
         cbs=cbs_,
@@ -67,16 +74,50 @@ class BaseSchedulerCB(Callback):
         if learn.training:
             self.sched.step()
 
+    def state_dict(self):
+        return self.sched.state_dict()
+
+    def load_state_dict(self, sd):
+        self.sched.load_state_dict(sd)
+
 # %% ../nbs/10_stable_sgd.ipynb 39
 class BatchSchedulerCB(BaseSchedulerCB):
-    """Step the scheduler every batch"""
+    """Step the scheduler every optimizer step"""
 
     def after_batch(self, learn):
-        self._step(learn)
+        if learn.stepped:
+            self._step(learn)
 
 # %% ../nbs/10_stable_sgd.ipynb 40
+def compile_spec(spec, target):
+    """Resolve a dotted `glom` path against `target` once, and return a getter
+    that repeats the same attribute and item lookups without parsing it again"""
+    getters = []
+    for part in spec.split("."):
+        if isinstance(target, Mapping):
+            getter = operator.itemgetter(part)
+        elif isinstance(target, Sequence) and part.lstrip("-").isdigit():
+            getter = operator.itemgetter(int(part))
+        else:
+            getter = operator.attrgetter(part)
+        target = getter(target)
+        getters.append(getter)
+
+    def get(x):
+        for getter in getters:
+            x = getter(x)
+        return x
+
+    return get
+
+
 class RecorderCB(Callback):
-    """Record internal state values at each batch."""
+    """Record internal state values at each batch.
+
+    `glom` specs (e.g., from `glomf`) are compiled into plain lookups on the
+    first batch, once everything they refer to exists; those that cannot be
+    compiled are left to `glom`. Numbers are written into arrays preallocated
+    for the whole fit, and anything else is kept in a list."""
 
     def __init__(self, **d):
         self.d = d
@@ -84,14 +125,64 @@ class RecorderCB(Callback):
 
     def before_fit(self, learn):
         self.learn = learn
-        self.recs = {k: [] for k in self.d}
         self.pg = learn.opt.param_groups[0]
+        self.getters = None
+        try:
+            self.size = len(learn.dls["train"]) * learn.n_epochs
+        except TypeError:
+            # e.g., a streaming dataset, so grow as needed
+            self.size = 1024
+        self.arrays = {k: None for k in self.d}
+        self.n = 0
+
+    def compile(self, v):
+        if (
+            isinstance(v, partial)
+            and v.func is glom
+            and isinstance(v.keywords.get("spec"), str)
+        ):
+            spec = v.keywords["spec"]
+        elif isinstance(v, str):
+            spec, v = v, partial(glom, spec=v)
+        else:
+            return v
+        try:
+            return compile_spec(spec, self)
+        except (AttributeError, LookupError, TypeError):
+            return v
+
+    def store(self, k, i, x):
+        a = self.arrays[k]
+        if isinstance(a, list):
+            a.append(x)
+        elif not isinstance(x, numbers.Real):
+            # e.g., a tensor, which we keep as it is rather than synchronize
+            self.arrays[k] = [] if a is None else a[:i].tolist()
+            self.arrays[k].append(x)
+        else:
+            if a is None:
+                a = self.arrays[k] = np.empty(self.size)
+            elif i == len(a):
+                a = self.arrays[k] = np.resize(a, 2 * len(a))
+            a[i] = x
 
     def after_batch(self, learn):
         if not learn.training:
             return
-        for k, v in self.d.items():
-            self.recs[k].append(v(self))
+        if self.getters is None:
+            self.getters = {k: self.compile(v) for k, v in self.d.items()}
+        i = self.n
+        for k, get in self.getters.items():
+            x, a = get(self), self.arrays[k]
+            if type(x) is float and type(a) is np.ndarray and i < len(a):
+                a[i] = x
+            else:
+                self.store(k, i, x)
+        self.n = i + 1
+
+    @property
+    def recs(self):
+        return {k: [] if a is None else a[: self.n] for k, a in self.arrays.items()}
 
     def plot(self, **kwargs):
         n = len(self.recs)
@@ -108,13 +199,95 @@ class RecorderCB(Callback):
             ax.legend()
         fig.tight_layout()
 
-# %% ../nbs/10_stable_sgd.ipynb 47
-def train_1cycle(model, lr=1e-2, n_epochs=3, extra_cbs=[]):
-    dls = fashion_mnist(512)
+# %% ../nbs/10_stable_sgd.ipynb 49
+def cos_anneal(start, end, pct):
+    return end + (start - end) / 2 * (np.cos(np.pi * pct) + 1)
+
+
+def one_cycle(
+    max_lr,
+    total_steps,
+    pct_start=0.3,
+    div_factor=25.0,
+    final_div_factor=1e4,
+    base_momentum=0.85,
+    max_momentum=0.95,
+):
+    """Learning rates and momenta of the 1cycle policy, for every step"""
+    t = np.arange(total_steps)
+    warmup = float(pct_start * total_steps) - 1
+    initial_lr = max_lr / div_factor
+    min_lr = initial_lr / final_div_factor
+    up, down = t / warmup, (t - warmup) / (total_steps - 1 - warmup)
+    lrs = np.where(
+        t <= warmup,
+        cos_anneal(initial_lr, max_lr, up),
+        cos_anneal(max_lr, min_lr, down),
+    )
+    moms = np.where(
+        t <= warmup,
+        cos_anneal(max_momentum, base_momentum, up),
+        cos_anneal(base_momentum, max_momentum, down),
+    )
+    return lrs, moms
+
+
+def cosine(lr_max, lr_min, total_steps):
+    """Cosine annealing from `lr_max` to `lr_min`, for every step"""
+    return cos_anneal(lr_max, lr_min, np.arange(total_steps) / total_steps)
+
+# %% ../nbs/10_stable_sgd.ipynb 50
+class ScheduleCB(Callback):
+    """Set the learning rate, and optionally the momentum, of every parameter
+    group from tables precomputed for the whole run, one entry per optimizer step"""
+
+    def __init__(self, lrs, moms=None):
+        self.lrs = np.asarray(lrs, dtype=float)
+        self.moms = None if moms is None else np.asarray(moms, dtype=float)
+
+    def before_fit(self, learn):
+        # Lists of Python floats are the cheapest to index
+        self.lrs_ = self.lrs.tolist()
+        self.moms_ = None if self.moms is None else self.moms.tolist()
+        self.step = 0
+        self.set(learn.opt)
+
+    def set(self, opt):
+        lr = self.lrs_[self.step]
+        mom = None if self.moms_ is None else self.moms_[self.step]
+        for pg in opt.param_groups:
+            pg["lr"] = lr
+            if mom is None:
+                continue
+            if "betas" in pg:
+                pg["betas"] = (mom, pg["betas"][1])
+            else:
+                pg["momentum"] = mom
+
+    def state_dict(self):
+        return dict(step=self.step)
+
+    def load_state_dict(self, sd):
+        self.step = sd["step"]
+
+    def before_batch(self, learn):
+        if learn.training and self.step >= len(self.lrs_):
+            raise ValueError(f"The schedule only has {len(self.lrs_)} steps")
+
+    def after_batch(self, learn):
+        if learn.training and learn.stepped:
+            self.step += 1
+            if self.step < len(self.lrs_):
+                self.set(learn.opt)
+
+# %% ../nbs/10_stable_sgd.ipynb 57
+def train_1cycle(model, lr=1e-2, n_epochs=3, extra_cbs=[], dls=None):
+    if dls is None:
+        dls = fashion_mnist(512)
     T_max = len(dls["train"]) * n_epochs
-    scheduler = BatchSchedulerCB(lr_scheduler.OneCycleLR, max_lr=lr, total_steps=T_max)
+    scheduler = ScheduleCB(*one_cycle(lr, T_max))
     recorder = RecorderCB(lr=g("pg.lr"), mom=g("pg.betas.0"))
-    cbs = [scheduler, recorder, stats, *extra_cbs]
+    cbs = [scheduler, recorder, *extra_cbs]
     try:
         stats = StoreModuleStatsCB(mods=model.layers)
     except AttributeError:
@@ -127,5 +300,6 @@ def train_1cycle(model, lr=1e-2, n_epochs=3, extra_cbs=[]):
         n_epochs,
         opt_func=torch.optim.AdamW,
         cbs=cbs,
+        dls=dls,
     )
     return recorder, stats
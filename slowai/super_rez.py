@@ -63,7 +63,6 @@ def get_imagenet_super_rez_dls(bs=512):
     """Get the Imagenet Super resolution data"""
     dsd = tiny_imagenet_dataset_dict()
     dsd["train"].set_transform(partial(preprocess, pipe=preprocess_trn, erase=True))
-    dsd["train"] = dsd["train"].shuffle()
     dsd["test"] = (
         dsd["test"]
         .map(
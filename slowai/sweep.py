@@ -0,0 +1,125 @@
+# AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/32_sweep.ipynb.
+
+# %% auto 0
+__all__ = ['TrialMetricsCB', 'fit_trial', 'tensor_store_dls', 'pin_threads', 'run_trial', 'sweep']
+
+# %% ../nbs/32_sweep.ipynb 2
+import itertools
+import math
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+import torch
+
+from .learner import Callback, CheckpointCB, DataLoaders, MetricsCB, after
+
+# %% ../nbs/32_sweep.ipynb 4
+class TrialMetricsCB(Callback, order=after(MetricsCB)):
+    """Keep the validation metrics of every epoch"""
+
+    def before_fit(self, learn):
+        self.history = []
+
+    def after_epoch(self, learn):
+        if not learn.model.training:
+            metrics = learn.metrics.all_metrics
+            self.history.append({k: m.compute().item() for k, m in metrics.items()})
+
+
+def fit_trial(config, n_epochs, train_fn, model_fn, dls_fn=None, checkpoint=None):
+    """Train `model_fn()` with `train_fn` for `n_epochs`, passing `config` as
+    keyword arguments, and return the validation metrics of the last epoch
+
+    With a `checkpoint`, training resumes from it, if it exists, and only runs
+    the remaining epochs, then saves the final state there for the next time."""
+    cbs = [TrialMetricsCB()]
+    if checkpoint is not None:
+        cbs.append(CheckpointCB(checkpoint, resume=True))
+    kwargs = dict(config)
+    if dls_fn is not None:
+        kwargs["dls"] = dls_fn()
+    train_fn(model_fn(), n_epochs=n_epochs, extra_cbs=cbs, **kwargs)
+    return cbs[0].history[-1]
+
+# %% ../nbs/32_sweep.ipynb 6
+def tensor_store_dls(dataset_id="fashion_mnist", bs=512, **kwargs):
+    """Loaders for a dataset served from its memory-mapped `TensorStore`"""
+    dls = DataLoaders.from_tensor_store(dataset_id, bs=bs, nworkers=0, **kwargs)
+    return dls.listify()
+
+# %% ../nbs/32_sweep.ipynb 8
+def pin_threads(n_threads):
+    torch.set_num_threads(n_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Already set, or inter-op parallelism has started
+        pass
+
+
+def run_trial(trial, config, n_epochs, checkpoint):
+    start = time.perf_counter()
+    metrics = trial(config, n_epochs, checkpoint=checkpoint)
+    return metrics, time.perf_counter() - start
+
+
+def sweep(
+    trial,  # Called as `trial(config, n_epochs, checkpoint=path)`, returns the metrics
+    configs,  # Keyword arguments for each trial
+    metric="loss",
+    mode="min",
+    min_epochs=1,  # Budget of the first rung
+    eta=2,  # Keep the best 1/eta trials after each rung
+    max_rungs=None,
+    nworkers=None,
+    n_threads=None,  # Threads per worker, by default, an even share of the CPUs
+    start_method="spawn",
+):
+    """Run `trial` for each of `configs` on a process pool, with successive
+    halving, and return the metrics of every trial at every rung as a table"""
+    configs = list(configs)
+    if not configs:
+        raise ValueError("There are no configurations to sweep")
+    nworkers = nworkers or min(len(configs), os.cpu_count())
+    n_threads = n_threads or max(1, os.cpu_count() // nworkers)
+    sign = 1 if mode == "min" else -1
+
+    def score(row):
+        value = row.get(metric, math.nan)
+        return math.inf if row["error"] or math.isnan(value) else sign * value
+
+    rows, alive = [], list(range(len(configs)))
+    with tempfile.TemporaryDirectory() as checkpoints, ProcessPoolExecutor(
+        nworkers,
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=pin_threads,
+        initargs=(n_threads,),
+    ) as pool:
+        for rung in itertools.count():
+            n_epochs = min_epochs * eta**rung
+            futures = {}
+            for i in alive:
+                # Survivors carry on from where the last rung left them
+                checkpoint = Path(checkpoints) / f"trial-{i}.pt"
+                args = trial, configs[i], n_epochs, checkpoint
+                futures[pool.submit(run_trial, *args)] = i
+            scores = {}
+            for future in as_completed(futures):
+                i = futures[future]
+                row = dict(trial=i, rung=rung, n_epochs=n_epochs, **configs[i])
+                try:
+                    metrics, seconds = future.result()
+                    row.update(metrics, seconds=seconds, error=None)
+                except Exception as e:
+                    row.update(error=repr(e))
+                rows.append(row)
+                scores[i] = score(row)
+            if len(alive) == 1 or rung + 1 == max_rungs:
+                break
+            alive = sorted(alive, key=scores.get)[: max(1, len(alive) // eta)]
+    return pd.DataFrame(rows)
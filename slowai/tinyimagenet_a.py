@@ -135,7 +135,6 @@ def preprocess_factory(pipe_):
 def get_imagenet_dls(bs=512, with_word=False, training_preprocessor=preprocess):
     dsd = tiny_imagenet_dataset_dict()
     dsd["train"].set_transform(preprocess_factory(training_preprocessor))
-    dsd["train"] = dsd["train"].shuffle()
     dsd["test"] = (
         dsd["test"]
         .map(preprocess_factory(preprocess), batched=True)